@@ -1,97 +1,557 @@
 import os
-from openai import OpenAI
-import requests
+import re
+import asyncio
 from dotenv import load_dotenv
 import logging
 import json
+import hashlib
+from .runtime import run_sync, iter_sync
+from .llm import chat_completion_async, stream_chat_completion_async, cached_completion_async, store_completion_async, get_route
+from .json_stream import JSONArrayItemParser
+from .microbatch import MicroBatcher
+from .cache import ProviderCache, get_cache_backend
+from .singleflight import SingleFlight
+from . import resilience, circuit, metrics
+from .ratelimit import RateLimitExceeded
+from .http_client import get_async_client
+from .deadline import DeadlineExceeded, deadline_scope, has_budget, wait_for
+from .canonical import get_brand_index, normalize_domain, normalize_brand_name, brand_domain
+from .industry_classifier import classify_industry
+from .similar_index import find_similar_brands, record_similar_brands
 
 # Load environment variables
 load_dotenv()
 
 # Set up API keys
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 HUNTER_API_KEY = os.getenv('HUNTER_API_KEY')
 
+# Hunter domain-search results are cached per domain in a backend shared by
+# all workers (sqlite or redis). Domains with no emails or a failed lookup
+# are cached for the shorter negative TTL.
+HUNTER_CACHE_BACKEND = os.getenv('HUNTER_CACHE_BACKEND', 'sqlite')
+HUNTER_CACHE_TTL = int(os.getenv('HUNTER_CACHE_TTL', 7 * 24 * 3600))
+HUNTER_NEGATIVE_CACHE_TTL = int(os.getenv('HUNTER_NEGATIVE_CACHE_TTL', 6 * 3600))
+# Ask Hunter's free email-count endpoint first and skip the paid domain-search
+# for domains it has no emails for. Counts are cached in the same backend.
+HUNTER_EMAIL_COUNT_PRECHECK = os.getenv('HUNTER_EMAIL_COUNT_PRECHECK', 'false').lower() == 'true'
+# Domain-search results are paged: HUNTER_PAGE_SIZE contacts per page, at most
+# HUNTER_MAX_PAGES pages, HUNTER_PAGE_CONCURRENCY of them fetched at once.
+# Paging stops once HUNTER_TARGET_CONTACTS target-role contacts are found.
+HUNTER_PAGE_SIZE = int(os.getenv('HUNTER_PAGE_SIZE', 10))
+HUNTER_MAX_PAGES = int(os.getenv('HUNTER_MAX_PAGES', 5))
+HUNTER_PAGE_CONCURRENCY = int(os.getenv('HUNTER_PAGE_CONCURRENCY', 3))
+HUNTER_TARGET_CONTACTS = int(os.getenv('HUNTER_TARGET_CONTACTS', 3))
+# Contact fields kept from Hunter's answer (its per-email 'sources' lists are dropped)
+HUNTER_CONTACT_FIELDS = ('value', 'type', 'confidence', 'first_name', 'last_name', 'position', 'seniority', 'department', 'linkedin', 'twitter', 'phone_number')
+TARGET_ROLE_PATTERN = re.compile(r'\b(ceo|cmo|cfo|chief (executive|marketing|financial) officer|marketing)\b', re.IGNORECASE)
+
+# Maximum number of similar brands researched in parallel (1 = sequential)
+RESEARCH_CONCURRENCY = int(os.getenv('RESEARCH_CONCURRENCY', 5))
+
+# get_industry calls arriving within INDUSTRY_BATCH_WINDOW_MS of each other
+# (across requests) are answered by one completion of up to INDUSTRY_BATCH_MAX_SIZE brands
+INDUSTRY_BATCHING = os.getenv('INDUSTRY_BATCHING', 'true').lower() == 'true'
+INDUSTRY_BATCH_WINDOW_MS = float(os.getenv('INDUSTRY_BATCH_WINDOW_MS', 5))
+INDUSTRY_BATCH_MAX_SIZE = int(os.getenv('INDUSTRY_BATCH_MAX_SIZE', 16))
+
+# Stream similar-brand completions and start researching each brand as soon
+# as its JSON object is complete, instead of waiting for the whole list
+STREAM_SIMILAR_BRANDS = os.getenv('STREAM_SIMILAR_BRANDS', 'true').lower() == 'true'
+MAX_SIMILAR_BRANDS = 5
+
+# Draft the emails for all similar brands in one completion instead of one each
+BATCH_EMAIL_DRAFTS = os.getenv('BATCH_EMAIL_DRAFTS', 'true').lower() == 'true'
+
+# Under a research deadline, don't start drafting a brand's email with less
+# than this many seconds left; its contacts are returned without a draft
+RESEARCH_DRAFT_MIN_BUDGET = float(os.getenv('RESEARCH_DRAFT_MIN_BUDGET', 5))
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-def get_similar_brands(brand_name):
+
+COMPANY_SYSTEM_PROMPT = "You are a helpful assistant that provides information about companies and industries."
+EMAIL_SYSTEM_PROMPT = "You are a professional email writer, crafting personalized outreach emails for business collaborations."
+
+
+def _batch_params(stage, size):
+    # A batched completion answers `size` requests: scale the stage's token
+    # limit (plus room for the JSON wrapper) and latency budget to match
+    route = get_route(stage)
+    params = {'timeout': route['timeout'] * (1 + (size - 1) / 2)}
+    if route.get('max_tokens'):
+        params['max_tokens'] = route['max_tokens'] * size + 32
+    return params
+
+async def _chat_async(stage, system_prompt, prompt, **params):
+    return await chat_completion_async(stage, [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ], **params)
+
+def _strip_code_fences(content):
+    # Remove markdown code block syntax if present
+    for fence in ('```json', '```python', '```'):
+        content = content.replace(fence, '')
+    return content.strip()
+
+def _parse_similar_brands(content):
+    return _validate_similar_brands(json.loads(_strip_code_fences(content)))
+
+def _is_valid_brand(brand):
+    # Each item must be a dictionary with 'company' and 'reason' keys
+    if isinstance(brand, dict) and isinstance(brand.get('company'), str) and 'reason' in brand:
+        return True
+    logger.warning(f"Skipping invalid brand data: {brand}")
+    return False
+
+def _validate_similar_brands(similar_brands):
+    if not isinstance(similar_brands, list):
+        raise ValueError("Response is not a list")
+
+    validated_brands = [brand for brand in similar_brands if _is_valid_brand(brand)]
+    logger.info(f"Processed similar brands: {validated_brands}")
+    return validated_brands[:MAX_SIMILAR_BRANDS]
+
+async def _stream_similar_brands(stage, messages, parser, **params):
     """
-    Use OpenAI to generate similar brands and reasons for similarity.
+    Stream a completion through `parser` and yield each valid brand object
+    (up to MAX_SIMILAR_BRANDS) as soon as it is complete. The full text is
+    left in parser.text().
     """
-    prompt = f"List 5 companies similar to {brand_name} in the same industry. For each company, provide a brief reason why it's similar. Format the response as a Python list of dictionaries, each with 'company' and 'reason' keys."
-    
+    count = 0
+    async for chunk in stream_chat_completion_async(stage, messages, **params):
+        for brand in parser.feed(chunk):
+            if count < MAX_SIMILAR_BRANDS and _is_valid_brand(brand):
+                count += 1
+                yield brand
+
+async def _canonical_name(brand_name):
+    # Every spelling of a brand ("Nike", "NIKE, Inc") gets the same name in prompts
+    index = get_brand_index()
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that provides information about companies and industries."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        content = response.choices[0].message.content.strip()
-        logger.info(f"OpenAI response: {content}")
-
-        # Remove markdown code block syntax if present
-        content = content.replace('```python', '').replace('```', '').strip()
-
-        # Safely evaluate the string as a Python expression
-        similar_brands = eval(content)
-        
-        if not isinstance(similar_brands, list):
-            raise ValueError("Response is not a list")
-        
-        # Ensure each item is a dictionary with 'company' and 'reason' keys
-        validated_brands = []
+        await asyncio.to_thread(index.observe, brand_name)
+    except Exception as e:
+        logger.warning(f"Could not update brand index: {str(e)}")
+    return index.display_name(brand_name)
+
+async def _learn_brands(brand_name, similar_brands):
+    # Grow the alias index from the company names (and websites) the LLM gave
+    # us, and the similar-brand index from the list itself
+    def learn():
+        index = get_brand_index()
         for brand in similar_brands:
-            if isinstance(brand, dict) and 'company' in brand and 'reason' in brand:
-                validated_brands.append(brand)
-            else:
-                logger.warning(f"Skipping invalid brand data: {brand}")
-        
-        logger.info(f"Processed similar brands: {validated_brands}")
-        return validated_brands[:5]  # Ensure we only return up to 5 brands
+            domain = brand.get('domain')
+            index.observe(brand['company'], domain if isinstance(domain, str) else None)
+            if isinstance(brand.get('reason'), str) and brand['reason'].strip():
+                index.describe(brand['company'], brand['reason'].strip())
+        record_similar_brands(brand_name, similar_brands)
+    try:
+        await asyncio.to_thread(learn)
+    except Exception as e:
+        logger.warning(f"Could not update brand index: {str(e)}")
+
+async def _local_similar_brands(brand_name):
+    # Similar brands from the local index, or None if the LLM is needed
+    return await asyncio.to_thread(find_similar_brands, brand_name, MAX_SIMILAR_BRANDS)
+
+async def _record_industry(brand_name, industry):
+    # LLM answers are the training data for the local industry classifier
+    if not industry or industry == "Unknown":
+        return
+    try:
+        await asyncio.to_thread(get_brand_index().record_industry, brand_name, industry)
+    except Exception as e:
+        logger.warning(f"Could not update brand index: {str(e)}")
+
+def _similar_brands_messages(brand_name):
+    prompt = f"List {MAX_SIMILAR_BRANDS} companies similar to {brand_name} in the same industry. For each company, provide a brief reason why it's similar. Format the response as a JSON array of objects, each with \"company\" and \"reason\" keys."
+    return [
+        {"role": "system", "content": COMPANY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+async def iter_similar_brands_async(brand_name):
+    """
+    Use OpenAI to generate similar brands and reasons for similarity, yielding
+    each brand as soon as the model has finished writing it. Brands the local
+    similar-brand index knows well are answered from it instead.
+    """
+    messages = _similar_brands_messages(await _canonical_name(brand_name))
+    local_brands = await _local_similar_brands(brand_name)
+    if local_brands:
+        for brand in local_brands:
+            yield brand
+        return
+    similar_brands = []
+    try:
+        if STREAM_SIMILAR_BRANDS:
+            parser = JSONArrayItemParser()
+            async for brand in _stream_similar_brands('similar_brands', messages, parser):
+                similar_brands.append(brand)
+                yield brand
+            logger.info(f"OpenAI response: {parser.text()}")
+        else:
+            content = await chat_completion_async('similar_brands', messages)
+            logger.info(f"OpenAI response: {content}")
+            for brand in _parse_similar_brands(content):
+                similar_brands.append(brand)
+                yield brand
+    except (DeadlineExceeded, circuit.CircuitOpenError) as e:
+        # Keep whatever brands arrived before the deadline
+        logger.warning(f"get_similar_brands cut short: {str(e)}")
     except Exception as e:
+        # Keep whatever brands arrived before the error
         logger.error(f"Error in get_similar_brands: {str(e)}", exc_info=True)
-        return []  # Return an empty list if there's an error
+    await _learn_brands(brand_name, similar_brands)
 
+async def get_similar_brands_async(brand_name):
+    """
+    Use OpenAI to generate similar brands and reasons for similarity.
+    Returns an empty list if there's an error.
+    """
+    return [brand async for brand in iter_similar_brands_async(brand_name)]
 
-def get_industry(brand_name):
+def get_similar_brands(brand_name):
     """
-    Use OpenAI to determine the industry of a brand
+    Synchronous wrapper around get_similar_brands_async.
     """
+    return run_sync(get_similar_brands_async(brand_name))
+
+
+def _industry_messages(brand_name):
     prompt = f"What industry is {brand_name} primarily operating in? Provide a one-word answer."
+    return [
+        {"role": "system", "content": COMPANY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+async def _classify_industries(brand_names):
+    """
+    Batch function for the industry micro-batcher: one JSON-mode completion
+    for several brands. Returns one industry (or None) per brand.
+    """
+    if len(brand_names) == 1:
+        return [await chat_completion_async('industry', _industry_messages(brand_names[0]))]
+    prompt = f"""
+    For each of these companies, give the industry it primarily operates in as a one-word answer: {json.dumps(brand_names)}
+    Respond with a JSON object with an "industries" key mapping each company name, exactly as given above, to its industry.
+    """
+    content = await _chat_async('industry', COMPANY_SYSTEM_PROMPT, prompt, response_format={"type": "json_object"}, **_batch_params('industry', len(brand_names)))
+    industries = json.loads(content).get('industries')
+    if not isinstance(industries, dict):
+        raise ValueError("Response has no industries mapping")
+    results = []
+    for brand_name in brand_names:
+        industry = industries.get(brand_name)
+        results.append(industry.strip() if isinstance(industry, str) and industry.strip() else None)
+    return results
+
+_industry_batcher = MicroBatcher(
+    'industry',
+    _classify_industries,
+    window=INDUSTRY_BATCH_WINDOW_MS / 1000,
+    max_batch_size=INDUSTRY_BATCH_MAX_SIZE
+)
+
+async def get_industry_async(brand_name):
+    """
+    Determine the industry of a brand: a previous OpenAI answer if cached,
+    else the local classifier if it is confident, else OpenAI.
+    """
+    brand_name = await _canonical_name(brand_name)
+    messages = _industry_messages(brand_name)
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that provides information about companies and industries."},
-                {"role": "user", "content": prompt}
-            ]
+        cached = await cached_completion_async('industry', messages)
+        if cached is not None:
+            return cached
+        index = get_brand_index()
+        industry = await asyncio.to_thread(
+            classify_industry, brand_name, index.get_domain(brand_name), index.get_description(brand_name)
         )
-        return response.choices[0].message.content.strip()
+        if industry:
+            return industry
+        if INDUSTRY_BATCHING:
+            try:
+                industry = await _industry_batcher.submit(brand_name)
+                if industry:
+                    await store_completion_async('industry', messages, industry)
+                    await _record_industry(brand_name, industry)
+                    return industry
+            except Exception as e:
+                logger.warning(f"Batched industry lookup failed for {brand_name}: {str(e)}")
+        industry = await chat_completion_async('industry', messages)
+        await _record_industry(brand_name, industry)
+        return industry
+    except (DeadlineExceeded, circuit.CircuitOpenError) as e:
+        logger.warning(f"get_industry cut short: {str(e)}")
+        return "Unknown"
     except Exception as e:
         logger.error(f"Error in get_industry: {str(e)}", exc_info=True)
         return "Unknown"
 
-def find_company_emails(domain):
+def get_industry(brand_name):
+    """
+    Synchronous wrapper around get_industry_async.
     """
-    Use Hunter.io API to find email addresses for a company
+    return run_sync(get_industry_async(brand_name))
+
+async def iter_discover_brand_async(brand_name):
+    """
+    Use a single JSON-mode OpenAI call to get both the industry of a brand and
+    similar brands with reasons.
+
+    Yields ('brand', brand) for each similar brand as soon as it has been
+    streamed, then ('industry', industry). Falls back to
+    iter_similar_brands_async and get_industry_async for whatever part of the
+    response cannot be parsed. Brands the local similar-brand index knows
+    well skip the call and only look up their industry.
+    """
+    display_name = await _canonical_name(brand_name)
+    local_brands = await _local_similar_brands(brand_name)
+    if local_brands:
+        for brand in local_brands:
+            yield 'brand', brand
+        yield 'industry', await get_industry_async(brand_name)
+        return
+
+    prompt = f"""
+    For the company {display_name}, respond with a JSON object with two keys:
+    - "similar_brands": a list of {MAX_SIMILAR_BRANDS} companies similar to it in the same industry, each an object with "company", "domain" and "reason" keys, where "domain" is the company's website domain and "reason" briefly explains why it's similar
+    - "industry": the industry it primarily operates in, as one word
     """
-    url = f"https://api.hunter.io/v2/domain-search?domain={domain}&api_key={HUNTER_API_KEY}"
+    messages = [
+        {"role": "system", "content": COMPANY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    similar_brands = []
+    industry = None
     try:
-        response = requests.get(url)
-        data = response.json()
-        if 'data' in data and 'emails' in data['data']:
-            return data['data']['emails']
+        if STREAM_SIMILAR_BRANDS:
+            parser = JSONArrayItemParser()
+            async for brand in _stream_similar_brands('discovery', messages, parser, response_format={"type": "json_object"}):
+                similar_brands.append(brand)
+                yield 'brand', brand
+            content = parser.text()
         else:
-            return []
+            content = await chat_completion_async('discovery', messages, response_format={"type": "json_object"})
+        logger.info(f"OpenAI discovery response: {content}")
+        discovery = json.loads(_strip_code_fences(content))
+        if not STREAM_SIMILAR_BRANDS:
+            for brand in _validate_similar_brands(discovery.get('similar_brands')):
+                similar_brands.append(brand)
+                yield 'brand', brand
+        if isinstance(discovery.get('industry'), str) and discovery['industry'].strip():
+            industry = discovery['industry'].strip()
+            await _record_industry(brand_name, industry)
     except Exception as e:
-        logger.error(f"Error in find_company_emails: {str(e)}", exc_info=True)
-        return []
+        logger.warning(f"Discovery call failed, falling back to separate calls: {str(e)}")
 
-def generate_tailored_email(user_company_info, recipient_company, outreach_goal, desired_cta):
+    if similar_brands:
+        await _learn_brands(brand_name, similar_brands)
+        if industry is None:
+            industry = await get_industry_async(brand_name)
+    else:
+        industry_task = asyncio.ensure_future(get_industry_async(brand_name)) if industry is None else None
+        try:
+            async for brand in iter_similar_brands_async(brand_name):
+                yield 'brand', brand
+            if industry_task is not None:
+                industry = await industry_task
+        finally:
+            if industry_task is not None:
+                industry_task.cancel()
+    yield 'industry', industry
+
+async def discover_brand_async(brand_name):
+    """
+    Get the similar brands and the industry of a brand.
+    Returns a (similar_brands, industry) tuple.
+    """
+    similar_brands = []
+    industry = None
+    async for kind, data in iter_discover_brand_async(brand_name):
+        if kind == 'brand':
+            similar_brands.append(data)
+        else:
+            industry = data
+    return similar_brands, industry
+
+def discover_brand(brand_name):
+    """
+    Synchronous wrapper around discover_brand_async.
+    """
+    return run_sync(discover_brand_async(brand_name))
+
+_hunter_cache = None
+_hunter_count_cache = None
+_hunter_flight = SingleFlight('hunter')
+_research_flight = SingleFlight('research')
+
+def get_hunter_cache():
+    global _hunter_cache
+    if _hunter_cache is None:
+        _hunter_cache = ProviderCache('hunter:domain-search', get_cache_backend(HUNTER_CACHE_BACKEND), ttl=HUNTER_CACHE_TTL)
+    return _hunter_cache
+
+def get_hunter_count_cache():
+    global _hunter_count_cache
+    if _hunter_count_cache is None:
+        _hunter_count_cache = ProviderCache('hunter:email-count', get_cache_backend(HUNTER_CACHE_BACKEND), ttl=HUNTER_CACHE_TTL)
+    return _hunter_count_cache
+
+def is_target_contact(contact):
+    """
+    True for the contacts outreach is aimed at: CEO, CMO, CFO and marketing.
+    """
+    return bool(TARGET_ROLE_PATTERN.search(contact.get('position') or '')) or contact.get('department') == 'marketing'
+
+async def _hunter_domain_search_page(domain, offset):
+    # Returns (contacts, total number of contacts Hunter has for the domain)
+    url = "https://api.hunter.io/v2/domain-search"
+    params = {'domain': domain, 'api_key': HUNTER_API_KEY, 'limit': HUNTER_PAGE_SIZE, 'offset': offset}
+
+    async def request():
+        response = await get_async_client().get(url, params=params)
+        response.raise_for_status()
+        return response
+
+    data = (await resilience.call('hunter', request)).json()
+    metrics.increment('hunter.pages.fetched')
+    if 'data' in data and 'emails' in data['data']:
+        contacts = [{key: email[key] for key in HUNTER_CONTACT_FIELDS if key in email} for email in data['data']['emails']]
+        total = (data.get('meta') or {}).get('results')
+        return contacts, total if isinstance(total, int) else len(contacts)
+    else:
+        return [], 0
+
+async def _iter_hunter_pages(domain):
+    """
+    Yield each page of a domain's Hunter contacts as it arrives. The first
+    page gives the total; the rest are fetched HUNTER_PAGE_CONCURRENCY at a
+    time, so closing the generator early saves the pages not yet requested.
+    """
+    contacts, total = await _hunter_domain_search_page(domain, 0)
+    yield contacts
+    offsets = iter(range(HUNTER_PAGE_SIZE, min(total, HUNTER_PAGE_SIZE * HUNTER_MAX_PAGES), HUNTER_PAGE_SIZE))
+    pending = set()
+    try:
+        while True:
+            for offset in offsets:
+                pending.add(asyncio.ensure_future(_hunter_domain_search_page(domain, offset)))
+                if len(pending) >= HUNTER_PAGE_CONCURRENCY:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    contacts, _ = task.result()
+                except Exception as e:
+                    # Keep the pages we have rather than failing the lookup
+                    metrics.increment('hunter.pages.failed')
+                    logger.warning(f"Hunter page for {domain} failed: {str(e)}")
+                    continue
+                yield contacts
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def _hunter_domain_search(domain):
+    emails = []
+    targets = 0
+    pages = _iter_hunter_pages(domain)
+    try:
+        async for contacts in pages:
+            emails.extend(contacts)
+            targets += sum(1 for contact in contacts if is_target_contact(contact))
+            if targets >= HUNTER_TARGET_CONTACTS:
+                metrics.increment('hunter.pages.early_stop')
+                break
+    finally:
+        await pages.aclose()
+    return emails
+
+async def _hunter_email_count(domain):
+    # The email-count endpoint is free and needs no API key
+    url = "https://api.hunter.io/v2/email-count"
+
+    async def request():
+        response = await get_async_client().get(url, params={'domain': domain})
+        response.raise_for_status()
+        return response
+
+    data = (await resilience.call('hunter', request, operation='email_count')).json()
+    total = data.get('data', {}).get('total')
+    return total if isinstance(total, int) else None
+
+async def _hunter_has_emails(domain):
+    """
+    False if Hunter's email count for `domain` is zero. True if it has emails
+    or the count could not be fetched (the domain-search decides).
+    """
+    cache = get_hunter_count_cache()
+    total = await cache.get_async(domain)
+    if total is None:
+        try:
+            total = await _hunter_email_count(domain)
+        except (DeadlineExceeded, circuit.CircuitOpenError, RateLimitExceeded):
+            raise
+        except Exception as e:
+            logger.warning(f"Hunter email count failed for {domain}, running domain-search: {str(e)}")
+            return True
+        if total is None:
+            return True
+        await cache.set_async(domain, total, HUNTER_CACHE_TTL if total else HUNTER_NEGATIVE_CACHE_TTL)
+    return total > 0
+
+async def _hunter_health_probe():
+    # The account endpoint is free and doesn't use search credits
+    response = await get_async_client().get("https://api.hunter.io/v2/account", params={'api_key': HUNTER_API_KEY})
+    response.raise_for_status()
+
+circuit.register_probe('hunter', _hunter_health_probe)
+
+async def find_company_emails_async(domain):
+    """
+    Use Hunter.io API to find email addresses for a company. With
+    HUNTER_EMAIL_COUNT_PRECHECK, domains Hunter counts no emails for skip the domain-search.
+    """
+    domain = normalize_domain(domain)
+    cache = get_hunter_cache()
+    emails = await cache.get_async(domain)
+    if emails is not None:
+        return emails
+
+    async def lookup():
+        try:
+            if HUNTER_EMAIL_COUNT_PRECHECK and not await _hunter_has_emails(domain):
+                metrics.increment('hunter.email_count.saved_lookups')
+                emails = []
+            else:
+                emails = await _hunter_domain_search(domain)
+        except (DeadlineExceeded, circuit.CircuitOpenError):
+            # Not a real miss, so don't cache it
+            raise
+        except RateLimitExceeded as e:
+            # Nor is running out of Hunter quota
+            logger.warning(f"Skipping Hunter lookup for {domain}: {str(e)}")
+            return []
+        except Exception as e:
+            logger.error(f"Error in find_company_emails: {str(e)}", exc_info=True)
+            emails = []
+        await cache.set_async(domain, emails, HUNTER_CACHE_TTL if emails else HUNTER_NEGATIVE_CACHE_TTL)
+        return emails
+
+    return await _hunter_flight.do(domain, lookup)
+
+def find_company_emails(domain):
+    """
+    Synchronous wrapper around find_company_emails_async.
+    """
+    return run_sync(find_company_emails_async(domain))
+
+async def generate_tailored_email_async(user_company_info, recipient_company, outreach_goal, desired_cta):
     """
     Use OpenAI to generate a tailored email
     """
@@ -104,44 +564,299 @@ def generate_tailored_email(user_company_info, recipient_company, outreach_goal,
     The email should be concise, friendly, and tailored to the recipient company.
     """
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional email writer, crafting personalized outreach emails for business collaborations."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+        return await _chat_async('drafting', EMAIL_SYSTEM_PROMPT, prompt)
+    except (DeadlineExceeded, circuit.CircuitOpenError):
+        raise
     except Exception as e:
         logger.error(f"Error in generate_tailored_email: {str(e)}", exc_info=True)
         return "Error generating email"
 
-def research_brand(brand_name, user_company_info, outreach_goal, desired_cta):
+def generate_tailored_email(user_company_info, recipient_company, outreach_goal, desired_cta):
+    """
+    Synchronous wrapper around generate_tailored_email_async.
+    """
+    return run_sync(generate_tailored_email_async(user_company_info, recipient_company, outreach_goal, desired_cta))
+
+async def generate_tailored_emails_async(user_company_info, recipient_companies, outreach_goal, desired_cta):
+    """
+    Use one JSON-mode OpenAI call to draft tailored emails for several
+    recipient companies that share the same sender, goal and call to action.
+    Companies whose draft is missing or invalid fall back to
+    generate_tailored_email_async. Returns {company: email}, where companies
+    left undrafted when the research deadline ran out or OpenAI was
+    unavailable map to None.
+    """
+    drafts = {}
+    prompt = f"""
+    Create a professional outreach email for each of these recipient companies: {json.dumps(recipient_companies)}
+    - Sender's company information: {user_company_info}
+    - Outreach goal: {outreach_goal}
+    - Desired Call to Action: {desired_cta}
+    Each email should be concise, friendly, and tailored to its recipient company.
+    Respond with a JSON object with an "emails" key holding a list with one object per recipient company, each with "company" (exactly as given above) and "email" keys.
+    """
+    try:
+        content = await _chat_async('drafting', EMAIL_SYSTEM_PROMPT, prompt, response_format={"type": "json_object"}, **_batch_params('drafting', len(recipient_companies)))
+        entries = json.loads(content).get('emails')
+        if not isinstance(entries, list):
+            raise ValueError("Response has no list of emails")
+        requested = {normalize_brand_name(company): company for company in recipient_companies}
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get('company'), str):
+                logger.warning(f"Skipping invalid email draft: {entry}")
+                continue
+            company = requested.get(normalize_brand_name(entry['company']))
+            email = entry.get('email')
+            if company and isinstance(email, str) and email.strip():
+                drafts[company] = email.strip()
+            else:
+                logger.warning(f"Skipping invalid email draft for {entry['company']}")
+    except Exception as e:
+        logger.warning(f"Batched email drafting failed, drafting one by one: {str(e)}")
+
+    missing = [company for company in recipient_companies if company not in drafts]
+    if missing:
+        fallbacks = await asyncio.gather(*(
+            generate_tailored_email_async(user_company_info, company, outreach_goal, desired_cta) for company in missing
+        ), return_exceptions=True)
+        for company, fallback in zip(missing, fallbacks):
+            if isinstance(fallback, (DeadlineExceeded, circuit.CircuitOpenError)):
+                drafts[company] = None
+            elif isinstance(fallback, BaseException):
+                raise fallback
+            else:
+                drafts[company] = fallback
+    return drafts
+
+def generate_tailored_emails(user_company_info, recipient_companies, outreach_goal, desired_cta):
+    """
+    Synchronous wrapper around generate_tailored_emails_async.
+    """
+    return run_sync(generate_tailored_emails_async(user_company_info, recipient_companies, outreach_goal, desired_cta))
+
+def guess_domain(company_name):
+    """
+    Return the known website domain of a company, or guess it from its canonical name
+    """
+    index = get_brand_index()
+    domain = index.get_domain(company_name)
+    if domain:
+        return domain
+    return f"www.{index.resolve(company_name).replace(' ', '')}.com"
+
+async def research_similar_brand_async(brand, user_company_info, outreach_goal, desired_cta, drafts=None):
+    """
+    Look up contacts and draft an outreach email for a single similar brand.
+    The Hunter lookup and the email draft are independent and run concurrently.
+    `drafts` is an optional future for the result of
+    generate_tailored_emails_async that covers this brand.
+
+    Stages the research deadline leaves no time for are skipped and listed
+    in the result's 'skipped' ('contacts', 'drafting'); stages whose provider's
+    circuit is open are skipped right away and listed in 'unavailable'.
+    """
+    company_name = brand['company']
+    logger.info(f"Processing similar brand: {company_name}")
+    # A streamed brand is researched before _learn_brands stores its domain,
+    # so use the one discovery gave for it directly
+    domain = brand.get('domain')
+    domain = (brand_domain(domain) if isinstance(domain, str) else None) or guess_domain(company_name)
+    skipped = []
+    unavailable = []
+
+    async def contacts():
+        try:
+            return await wait_for(find_company_emails_async(domain), 'hunter')
+        except DeadlineExceeded:
+            skipped.append('contacts')
+        except circuit.CircuitOpenError:
+            unavailable.append('contacts')
+        return []
+
+    async def draft():
+        email = None
+        if has_budget(RESEARCH_DRAFT_MIN_BUDGET):
+            try:
+                if drafts is not None:
+                    # Shielded so one brand being cancelled does not cancel the shared batch
+                    email = (await wait_for(asyncio.shield(drafts), 'drafting')).get(company_name)
+                else:
+                    email = await wait_for(generate_tailored_email_async(user_company_info, company_name, outreach_goal, desired_cta), 'drafting')
+            except DeadlineExceeded:
+                pass
+            except circuit.CircuitOpenError:
+                unavailable.append('drafting')
+                return None
+        if email is None:
+            if circuit.available('openai'):
+                skipped.append('drafting')
+            else:
+                unavailable.append('drafting')
+        return email
+
+    emails, tailored_email = await asyncio.gather(contacts(), draft())
+    return {
+        'domain': domain,
+        'emails': emails,
+        'tailored_email': tailored_email,
+        'reason': brand['reason'],
+        'skipped': skipped,
+        'unavailable': unavailable
+    }
+
+async def iter_research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency=None, deadline=None):
+    """
+    Research a brand and yield results as soon as they are available.
+
+    Yields ('overview', brand_name, {'similar_brands': ..., 'industry': ..., 'incomplete': ..., 'unavailable': ...})
+    first, then ('brand', company_name, brand_result) for each similar brand
+    in the order they finish. Research on each similar brand starts as soon
+    as the discovery completion has streamed it. At most `max_concurrency`
+    similar brands (defaults to RESEARCH_CONCURRENCY) are researched at once.
+
+    With a `deadline` (seconds), every provider call is bounded by the time
+    left and stages that no longer fit are skipped, so all events arrive
+    within the deadline. 'incomplete' is set if discovery was cut short,
+    and 'unavailable' lists the overview stages ('discovery', 'industry')
+    that came back empty because OpenAI's circuit is open.
+    """
+    with deadline_scope(deadline):
+        async for event in _iter_research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency):
+            yield event
+
+async def _iter_research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency):
     logger.info(f"Starting research for brand: {brand_name}")
-    results = {}
+    if max_concurrency is None:
+        max_concurrency = RESEARCH_CONCURRENCY
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    # The batched drafts need the full list of brands, so brands that arrive
+    # early start their Hunter lookup and wait on this future for the email
+    drafts = asyncio.get_running_loop().create_future() if BATCH_EMAIL_DRAFTS else None
+    drafts_task = None
+
+    async def research_one(brand):
+        async with semaphore:
+            result = await research_similar_brand_async(brand, user_company_info, outreach_goal, desired_cta, drafts)
+            return brand['company'], result
+
+    def resolve_drafts(task):
+        if drafts.done():
+            return
+        if task.cancelled():
+            drafts.cancel()
+        elif task.exception() is not None:
+            drafts.set_exception(task.exception())
+        else:
+            drafts.set_result(task.result())
+
+    similar_brands = []
+    industry = None
+    tasks = []
     try:
-        similar_brands = get_similar_brands(brand_name)
+        async for kind, data in iter_discover_brand_async(brand_name):
+            if kind == 'brand':
+                similar_brands.append(data)
+                tasks.append(asyncio.ensure_future(research_one(data)))
+            else:
+                industry = data
         logger.info(f"Similar brands found: {similar_brands}")
-        industry = get_industry(brand_name)
         logger.info(f"Industry determined: {industry}")
-        results[brand_name] = {
+
+        if drafts is not None and similar_brands:
+            companies = list(dict.fromkeys(brand['company'] for brand in similar_brands))
+            if has_budget(RESEARCH_DRAFT_MIN_BUDGET):
+                drafts_task = asyncio.ensure_future(generate_tailored_emails_async(user_company_info, companies, outreach_goal, desired_cta))
+                drafts_task.add_done_callback(resolve_drafts)
+            else:
+                logger.warning(f"Skipping email drafts for {brand_name}: research deadline too close")
+                drafts.set_result(dict.fromkeys(companies))
+
+        unavailable = []
+        if not circuit.available('openai'):
+            missing = {'discovery': not similar_brands, 'industry': industry in (None, "Unknown")}
+            unavailable = [stage for stage, is_missing in missing.items() if is_missing]
+
+        yield 'overview', brand_name, {
             'similar_brands': similar_brands,
-            'industry': industry
+            'industry': industry,
+            'incomplete': not has_budget(0.001) or bool(unavailable),
+            'unavailable': unavailable
         }
-        for brand in similar_brands:
-            company_name = brand['company']
-            logger.info(f"Processing similar brand: {company_name}")
-            domain = f"www.{company_name.lower().replace(' ', '')}.com"
-            emails = find_company_emails(domain)
-            tailored_email = generate_tailored_email(user_company_info, company_name, outreach_goal, desired_cta)
-            results[company_name] = {
-                'domain': domain,
-                'emails': emails,
-                'tailored_email': tailored_email,
-                'reason': brand['reason']
-            }
+
+        for next_done in asyncio.as_completed(tasks):
+            company_name, brand_result = await next_done
+            yield 'brand', company_name, brand_result
+    finally:
+        # Stop outstanding work if the consumer goes away early
+        for task in tasks:
+            task.cancel()
+        if drafts_task is not None:
+            drafts_task.cancel()
+        if drafts is not None:
+            drafts.cancel()
+
+def iter_research_brand(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency=None, deadline=None):
+    """
+    Synchronous generator wrapper around iter_research_brand_async.
+    """
+    return iter_sync(iter_research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency, deadline))
+
+def research_key(brand_name, user_company_info, outreach_goal, desired_cta):
+    """
+    Key identifying equivalent research requests, using the canonical brand id.
+    """
+    normalized = [get_brand_index().resolve(brand_name)]
+    normalized += [' '.join(str(value).lower().split()) for value in (user_company_info, outreach_goal, desired_cta)]
+    return hashlib.sha256(json.dumps(normalized).encode('utf-8')).hexdigest()
+
+async def research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency=None, deadline=None):
+    """
+    Research a brand, its industry and similar brands.
+
+    Safe to await from an async Flask view or an ASGI app. Results keep the
+    order of the similar brands. Identical requests already in flight share
+    one run of the pipeline.
+
+    With a `deadline` (seconds) the research returns in time with whatever
+    it finished: the overview is marked 'incomplete' and each brand lists
+    the stages it 'skipped'. Stages whose provider is unavailable are listed
+    in 'unavailable' and also mark the overview incomplete.
+    """
+    key = research_key(brand_name, user_company_info, outreach_goal, desired_cta)
+    with deadline_scope(deadline):
+        results = await _research_flight.do(
+            key,
+            lambda: _research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency)
+        )
+    # A shared result is keyed by the leader's spelling of the brand name
+    seed = next(iter(results))
+    if seed != brand_name:
+        results = {brand_name if name == seed else name: data for name, data in results.items()}
+    return results
+
+async def _research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency):
+    results = {}
+    brand_results = {}
+    try:
+        async for kind, name, data in iter_research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency):
+            if kind == 'overview':
+                results[name] = data
+            else:
+                brand_results[name] = data
+        for brand in results[brand_name]['similar_brands']:
+            results[brand['company']] = brand_results[brand['company']]
+            if brand_results[brand['company']]['skipped'] or brand_results[brand['company']]['unavailable']:
+                results[brand_name]['incomplete'] = True
+        if results[brand_name]['incomplete']:
+            logger.warning(f"Research for {brand_name} is incomplete: deadline reached or provider unavailable")
         logger.info("Research completed successfully")
         return results
     except Exception as e:
         logger.error(f"Error during research: {str(e)}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
+
+def research_brand(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency=None, deadline=None):
+    """
+    Synchronous wrapper around research_brand_async.
+    """
+    return run_sync(research_brand_async(brand_name, user_company_info, outreach_goal, desired_cta, max_concurrency, deadline))
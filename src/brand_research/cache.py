@@ -0,0 +1,299 @@
+# src/brand_research/cache.py
+#
+# Key/value cache backends for provider responses (OpenAI, Hunter, SerpAPI).
+#
+# All backends store strings with an optional TTL and share one interface:
+#   get(key) -> str or None, set(key, value, ttl=None), delete(key)
+#
+#   - MemoryCache : per-process LRU dict
+#   - SQLiteCache : file-backed, shared by every process on the host, LRU by last access
+#   - RedisCache  : shared by every host; eviction follows the server's
+#                   maxmemory-policy (use allkeys-lru)
+#
+# ProviderCache adds JSON (de)serialisation, a namespace, a default TTL and
+# hit/miss counters on top of a backend.
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+import redis
+from dotenv import load_dotenv
+from . import metrics
+
+# Load environment variables
+load_dotenv()
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', 'hustler_cache.db')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry TTL.
+    """
+    blocking = False
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                metrics.increment('cache.evictions')
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteCache:
+    """
+    SQLite-backed cache with per-entry TTL and LRU eviction. Safe to share
+    between threads and between processes using the same file.
+    """
+    blocking = True
+
+    # Check the size limit every this many writes rather than on each one
+    EVICT_EVERY = 100
+
+    def __init__(self, path=CACHE_SQLITE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICT_EVERY == 0
+        if evict:
+            self._evict()
+
+    def delete(self, key):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _evict(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (excess,)
+                )
+                metrics.increment('cache.evictions', excess)
+
+
+class RedisCache:
+    """
+    Redis-backed cache shared by all workers and hosts.
+    """
+    blocking = True
+
+    def __init__(self, url=REDIS_URL, prefix='hustler:cache:'):
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self._redis.get(self.prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._redis.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self._redis.delete(self.prefix + key)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def create_cache_backend(kind):
+    if kind == 'memory':
+        return MemoryCache()
+    if kind == 'sqlite':
+        return SQLiteCache()
+    if kind == 'redis':
+        return RedisCache()
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+def get_cache_backend(kind=None):
+    """
+    Return the shared backend of the given kind (defaults to CACHE_BACKEND).
+    """
+    kind = kind or CACHE_BACKEND
+    with _backends_lock:
+        if kind not in _backends:
+            _backends[kind] = create_cache_backend(kind)
+        return _backends[kind]
+
+
+class ProviderCache:
+    """
+    JSON cache for one kind of provider response, stored under `namespace`
+    in a shared backend.
+
+    Entries are {'value': ..., 'stored_at': unix time}. Backend failures are
+    logged and treated as misses so a cache outage never breaks a request.
+    """
+
+    def __init__(self, namespace, backend=None, ttl=3600):
+        self.namespace = namespace
+        self.backend = backend or get_cache_backend()
+        self.ttl = ttl
+        self._refreshing = {}
+
+    def _count(self, event):
+        metrics.increment(f"cache.{self.namespace}.{event}")
+
+    def get_entry(self, key):
+        try:
+            raw = self.backend.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning(f"Cache read failed for {self.namespace}: {str(e)}")
+            raw = None
+        if raw is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return json.loads(raw)
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return entry['value'] if entry is not None else default
+
+    def set(self, key, value, ttl=None):
+        entry = {'value': value, 'stored_at': time.time()}
+        try:
+            self.backend.set(f"{self.namespace}:{key}", json.dumps(entry), ttl or self.ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {self.namespace}: {str(e)}")
+
+    def delete(self, key):
+        try:
+            self.backend.delete(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {self.namespace}: {str(e)}")
+
+    async def get_entry_async(self, key):
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.get_entry, key)
+        return self.get_entry(key)
+
+    async def get_async(self, key, default=None):
+        entry = await self.get_entry_async(key)
+        return entry['value'] if entry is not None else default
+
+    async def set_async(self, key, value, ttl=None):
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.set, key, value, ttl)
+        return self.set(key, value, ttl)
+
+    async def get_or_fetch_async(self, key, fetch, ttl=None, stale_ttl=0):
+        """
+        Return the cached value for `key`, calling `await fetch()` on a miss.
+
+        With stale_ttl > 0 the cache works in stale-while-revalidate mode: an
+        entry older than `ttl` but younger than `ttl + stale_ttl` is returned
+        right away and refreshed in the background.
+        """
+        ttl = ttl or self.ttl
+        entry = await self.get_entry_async(key)
+        if entry is not None:
+            age = time.time() - entry['stored_at']
+            if age < ttl:
+                return entry['value']
+            if age < ttl + stale_ttl:
+                self._count('stale')
+                self._refresh_in_background(key, fetch, ttl + stale_ttl)
+                return entry['value']
+        value = await fetch()
+        await self.set_async(key, value, ttl + stale_ttl)
+        return value
+
+    def _refresh_in_background(self, key, fetch, store_ttl):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self.set_async(key, await fetch(), store_ttl)
+                self._count('refreshes')
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {self.namespace}: {str(e)}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._refreshing[key] = asyncio.ensure_future(refresh())
+
+    def stats(self):
+        hits = metrics.get_counter(f"cache.{self.namespace}.hits")
+        misses = metrics.get_counter(f"cache.{self.namespace}.misses")
+        total = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
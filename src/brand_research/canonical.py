@@ -0,0 +1,289 @@
+# src/brand_research/canonical.py
+#
+# Brand-name canonicalisation. "Nike", "nike", "Nike Inc." and "NIKE, Inc"
+# all map to the canonical brand id "nike", which the research pipeline uses
+# in prompts, cache keys, dedup keys and domain guesses.
+#
+# The alias index lives in SQLite so every worker shares it, and it grows as
+# we see answers: company names returned by the LLM, and websites found via
+# the LLM or SerpAPI (two names with the same website are the same brand).
+# Only a brand's own homepage counts as its website: search results on
+# Wikipedia, Amazon, LinkedIn etc. or deep links are ignored, and a brand's
+# known website is never replaced by a later answer.
+# It also keeps the latest description and LLM-given industry of each brand,
+# which are the training data for the local industry classifier.
+
+import os
+import re
+import time
+import sqlite3
+import threading
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BRAND_INDEX_PATH = os.getenv('BRAND_INDEX_PATH', 'hustler_brands.db')
+# How often (seconds) a worker reloads aliases learned by other workers
+BRAND_INDEX_RELOAD_INTERVAL = int(os.getenv('BRAND_INDEX_RELOAD_INTERVAL', 60))
+
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd', 'limited',
+    'llc', 'llp', 'plc', 'gmbh', 'ag', 'sa', 'se', 'nv', 'bv', 'spa', 'ab', 'oy', 'pty', 'kk',
+}
+
+# Sites that host pages about many brands, so sharing one says nothing.
+# Matched against every label of a host name: en.wikipedia.org, amazon.co.uk
+AGGREGATOR_SITES = {
+    'wikipedia', 'wikidata', 'amazon', 'ebay', 'etsy', 'walmart', 'linkedin', 'facebook',
+    'instagram', 'twitter', 'x', 'tiktok', 'youtube', 'pinterest', 'reddit', 'crunchbase',
+    'bloomberg', 'forbes', 'glassdoor', 'indeed', 'yelp', 'trustpilot', 'medium', 'google',
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _bare(word):
+    return re.sub(r'\W+', '', word.lower())
+
+def _strip_legal_suffixes(words):
+    while len(words) > 1 and _bare(words[-1]) in LEGAL_SUFFIXES:
+        words = words[:-1]
+        # 'Levi Strauss & Co.' -> 'Levi Strauss'
+        if len(words) > 1 and _bare(words[-1]) in ('and', ''):
+            words = words[:-1]
+    if len(words) > 1 and _bare(words[0]) == 'the':
+        words = words[1:]
+    return words
+
+def _words(name):
+    name = name.replace("'", '').replace('’', '').replace('&', ' and ')
+    return re.sub(r'[\W_]+', ' ', name).split()
+
+def normalize_brand_name(name):
+    """
+    Normalise case, punctuation and legal suffixes: 'NIKE, Inc.' -> 'nike'
+    """
+    return ' '.join(_strip_legal_suffixes(_words(name.lower())))
+
+def display_brand_name(name):
+    """
+    Clean up a brand name for prompts without changing its case: 'NIKE, Inc.' -> 'NIKE'
+    """
+    words = _strip_legal_suffixes(name.replace(',', ' ').split())
+    return ' '.join(words).rstrip('.') or name.strip()
+
+def normalize_domain(domain):
+    """
+    Reduce a URL or host name to a bare domain, e.g. 'https://www.Nike.com/' -> 'nike.com'
+    """
+    domain = domain.strip().lower()
+    if '://' in domain:
+        domain = domain.split('://', 1)[1]
+    domain = domain.split('/', 1)[0].split(':', 1)[0].rstrip('.')
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
+
+def is_aggregator_domain(domain):
+    """
+    True for sites with pages about many brands, e.g. 'en.wikipedia.org' or 'amazon.co.uk'
+    """
+    return any(label in AGGREGATOR_SITES for label in normalize_domain(domain).split('.'))
+
+def brand_domain(url):
+    """
+    Return the domain of a URL that can be a brand's own website: a homepage
+    (no path) that is not on an aggregator site. Returns None otherwise, e.g.
+    for 'https://en.wikipedia.org/wiki/Allbirds'.
+    """
+    url = url.strip()
+    rest = url.split('://', 1)[1] if '://' in url else url
+    if rest.split('?', 1)[0].split('#', 1)[0].strip('/').count('/'):
+        return None
+    domain = normalize_domain(url)
+    if not domain or '.' not in domain or is_aggregator_domain(domain):
+        return None
+    return domain
+
+
+class BrandIndex:
+    """
+    Alias table mapping normalised brand names to canonical brand ids, plus
+    the display name and known website domain of each brand.
+
+    Reads are served from memory; writes go to SQLite and memory.
+    """
+
+    def __init__(self, path=BRAND_INDEX_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._aliases = {}
+        self._brands = {}
+        self._domains = {}
+        self._loaded_at = 0
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, brand_id TEXT NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS brands ("
+                "brand_id TEXT PRIMARY KEY, name TEXT NOT NULL, domain TEXT, updated_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(brands)")}
+            for column in ('description', 'industry'):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE brands ADD COLUMN {column} TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS brands_domain ON brands (domain)")
+        self._reload()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _reload(self):
+        conn = self._connection()
+        aliases = dict(conn.execute("SELECT alias, brand_id FROM aliases"))
+        brands = {}
+        domains = {}
+        for brand_id, name, domain, description in conn.execute("SELECT brand_id, name, domain, description FROM brands"):
+            # Ignore websites recorded from aggregator search results
+            domain = brand_domain(domain) if domain else None
+            brands[brand_id] = {'name': name, 'domain': domain, 'description': description}
+            if domain:
+                domains[domain] = brand_id
+        with self._lock:
+            self._aliases, self._brands, self._domains = aliases, brands, domains
+            self._loaded_at = time.monotonic()
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._loaded_at > BRAND_INDEX_RELOAD_INTERVAL:
+            try:
+                self._reload()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not reload brand index: {str(e)}")
+
+    def resolve(self, name):
+        """
+        Return the canonical brand id for a name.
+        """
+        self._maybe_reload()
+        normalized = normalize_brand_name(name)
+        with self._lock:
+            return self._aliases.get(normalized, normalized)
+
+    def display_name(self, name):
+        """
+        Return the name to use for a brand in prompts, the same for every alias.
+        """
+        brand_id = self.resolve(name)
+        with self._lock:
+            brand = self._brands.get(brand_id)
+        return brand['name'] if brand else display_brand_name(name)
+
+    def get_domain(self, name):
+        brand_id = self.resolve(name)
+        with self._lock:
+            brand = self._brands.get(brand_id)
+        return brand['domain'] if brand else None
+
+    def get_description(self, name):
+        brand_id = self.resolve(name)
+        with self._lock:
+            brand = self._brands.get(brand_id)
+        return brand['description'] if brand else None
+
+    def add_alias(self, alias, brand_id):
+        normalized = normalize_brand_name(alias)
+        if not normalized or normalized == brand_id:
+            return
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO aliases (alias, brand_id) VALUES (?, ?)", (normalized, brand_id))
+        with self._lock:
+            self._aliases[normalized] = brand_id
+
+    def observe(self, name, domain=None):
+        """
+        Record a brand name seen in an LLM or SerpAPI answer, optionally with
+        its website. A new name whose website already belongs to a known
+        brand becomes an alias of that brand; a known brand's website is only
+        recorded if it has none yet. Websites that are not a brand's own
+        homepage (see brand_domain) are ignored. Returns the canonical brand id.
+        """
+        brand_id = self.resolve(name)
+        domain = brand_domain(domain) if domain else None
+        with self._lock:
+            owner = self._domains.get(domain) if domain else None
+            brand = self._brands.get(brand_id)
+        if owner and owner != brand_id:
+            if brand is None:
+                self.add_alias(name, owner)
+                return owner
+            # Two known brands never merge, and the website stays with its owner
+            domain = None
+        if brand and (domain is None or brand['domain']):
+            return brand_id
+
+        name = brand['name'] if brand else display_brand_name(name)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO brands (brand_id, name, domain, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (brand_id) DO UPDATE SET name = excluded.name, domain = excluded.domain, updated_at = excluded.updated_at",
+                (brand_id, name, domain, time.time())
+            )
+        with self._lock:
+            self._brands[brand_id] = {'name': name, 'domain': domain, 'description': brand['description'] if brand else None}
+            if domain:
+                self._domains[domain] = brand_id
+        return brand_id
+
+    def _update(self, name, column, value):
+        brand_id = self.observe(name)
+        with self._connection() as conn:
+            conn.execute(f"UPDATE brands SET {column} = ?, updated_at = ? WHERE brand_id = ?", (value, time.time(), brand_id))
+        return brand_id
+
+    def describe(self, name, description):
+        """
+        Record a short description of a brand (e.g. an LLM's reason for suggesting it).
+        """
+        brand_id = self._update(name, 'description', description)
+        with self._lock:
+            self._brands[brand_id]['description'] = description
+        return brand_id
+
+    def record_industry(self, name, industry):
+        """
+        Record the industry an LLM gave for a brand.
+        """
+        return self._update(name, 'industry', industry)
+
+    def labeled_brands(self):
+        """
+        Return (name, domain, description, industry) for every brand with a recorded industry.
+        """
+        with self._connection() as conn:
+            return conn.execute(
+                "SELECT name, domain, description, industry FROM brands WHERE industry IS NOT NULL"
+            ).fetchall()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_brand_index():
+    """
+    Return the shared BrandIndex.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BrandIndex()
+        return _index
+
+def canonical_brand_id(name):
+    return get_brand_index().resolve(name)
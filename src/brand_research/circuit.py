@@ -0,0 +1,235 @@
+# src/brand_research/circuit.py
+#
+# Circuit breakers for external providers (OpenAI, Hunter, SerpAPI).
+#
+# A breaker watches the outcome of every call to its provider over a sliding
+# window. When too many calls fail (timeouts, connection errors, 5xx) or are
+# too slow, it opens: calls fail right away with CircuitOpenError instead of
+# each waiting for its own timeout, and research marks the stage unavailable.
+# After the provider's open_seconds it goes half-open and checks whether the provider
+# is back, with the provider's health probe if one is registered (e.g. a free
+# account endpoint) or else by letting a few real calls through. Success
+# closes it again; failure reopens it.
+#
+#     circuit.get_breaker('hunter').before_call()   # done for you by resilience.call
+#
+# Thresholds are per provider; override them with e.g.
+# CIRCUIT_BREAKERS='{"hunter": {"failure_rate": 0.3, "open_seconds": 60}}'
+
+import os
+import json
+import time
+import asyncio
+import threading
+import logging
+from collections import deque
+from dotenv import load_dotenv
+from . import metrics
+
+# Load environment variables
+load_dotenv()
+
+CIRCUIT_BREAKERS_ENABLED = os.getenv('CIRCUIT_BREAKERS_ENABLED', 'true').lower() == 'true'
+
+# window: seconds of calls considered; min_calls: calls needed in the window
+# before it can trip; failure_rate/slow_rate: share of failed/slow calls that
+# trips it; slow_call: seconds after which a successful call counts as slow;
+# open_seconds: how long it stays open; half_open_calls: trial calls let
+# through when the provider has no health probe
+CIRCUIT_BREAKERS = {
+    'openai': {'window': 60, 'min_calls': 10, 'failure_rate': 0.5, 'slow_call': 30, 'slow_rate': 0.8, 'open_seconds': 30, 'half_open_calls': 2},
+    'hunter': {'window': 60, 'min_calls': 5, 'failure_rate': 0.5, 'slow_call': 8, 'slow_rate': 0.8, 'open_seconds': 30, 'half_open_calls': 1},
+    'serpapi': {'window': 60, 'min_calls': 5, 'failure_rate': 0.5, 'slow_call': 8, 'slow_rate': 0.8, 'open_seconds': 30, 'half_open_calls': 1},
+    # One breaker covers every crawled site, so it only opens when most of
+    # them fail at once (our network, not a single broken site)
+    'crawler': {'window': 60, 'min_calls': 20, 'failure_rate': 0.8, 'slow_call': 8, 'slow_rate': 0.9, 'open_seconds': 30, 'half_open_calls': 2},
+}
+DEFAULT_BREAKER = {'window': 60, 'min_calls': 5, 'failure_rate': 0.5, 'slow_call': 10, 'slow_rate': 0.8, 'open_seconds': 30, 'half_open_calls': 1}
+for _provider, _overrides in json.loads(os.getenv('CIRCUIT_BREAKERS', '{}')).items():
+    CIRCUIT_BREAKERS[_provider] = {**CIRCUIT_BREAKERS.get(_provider, DEFAULT_BREAKER), **_overrides}
+
+# Seconds a health probe may take before it counts as a failure
+CIRCUIT_PROBE_TIMEOUT = float(os.getenv('CIRCUIT_PROBE_TIMEOUT', 5))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+logger = logging.getLogger(__name__)
+
+_probes = {}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider whose circuit is open.
+    """
+
+
+def register_probe(provider, probe):
+    """
+    Use `probe` (an async callable that raises if the provider is unhealthy)
+    to decide when `provider`'s open circuit may close again.
+    """
+    _probes[provider] = probe
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker for one provider. Thread-safe; shared by
+    every event loop in the process.
+    """
+
+    def __init__(self, provider, policy):
+        self.provider = provider
+        self.policy = policy
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        # (time, failed, slow) for each call in the window
+        self._calls = deque()
+        self._opened_at = None
+        self._trials = 0
+        self._trial_successes = 0
+        self._trial_at = 0
+        self._probing = False
+        self._probe_task = None
+
+    def _trim(self, now):
+        while self._calls and self._calls[0][0] < now - self.policy['window']:
+            self._calls.popleft()
+
+    def _rates(self):
+        total = len(self._calls)
+        if not total:
+            return 0.0, 0.0
+        failed = sum(1 for _, is_failed, _ in self._calls if is_failed)
+        slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+        return failed / total, slow / total
+
+    def _transition(self, state, reason=None):
+        # Called with the lock held
+        if state == self.state:
+            return
+        self.state = state
+        self._trials = 0
+        self._trial_successes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning(f"{self.provider} circuit opened: {reason}")
+        elif state == CLOSED:
+            self._opened_at = None
+            self._calls.clear()
+            logger.info(f"{self.provider} circuit closed")
+        metrics.increment(f"circuit.{self.provider}.{state}")
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if a call to the provider should not be made now.
+        """
+        start_probe = False
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.policy['open_seconds']:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self.provider in _probes:
+                    start_probe = not self._probing
+                    self._probing = True
+                elif (self._trials < self.policy['half_open_calls']
+                      or time.monotonic() - self._trial_at >= self.policy['open_seconds']):
+                    # A trial that never reported back (e.g. cancelled) frees its slot after open_seconds
+                    self._trials += 1
+                    self._trial_at = time.monotonic()
+                    return
+            elif self.state == CLOSED:
+                return
+        if start_probe:
+            self._probe_task = asyncio.ensure_future(self._probe())
+        metrics.increment(f"circuit.{self.provider}.rejected")
+        raise CircuitOpenError(f"{self.provider} is unavailable (circuit {self.state})")
+
+    async def _probe(self):
+        try:
+            await asyncio.wait_for(_probes[self.provider](), CIRCUIT_PROBE_TIMEOUT)
+            healthy, reason = True, None
+        except Exception as e:
+            healthy, reason = False, f"health probe failed ({str(e) or type(e).__name__})"
+        with self._lock:
+            self._probing = False
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED if healthy else OPEN, reason)
+
+    def record(self, failed, latency=None):
+        """
+        Record the outcome of a call that before_call() let through.
+        """
+        slow = not failed and latency is not None and latency >= self.policy['slow_call']
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN, 'trial call failed' if failed else 'trial call too slow')
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.policy['half_open_calls']:
+                        self._transition(CLOSED)
+                return
+            if self.state == OPEN:
+                return
+            now = time.monotonic()
+            self._calls.append((now, failed, slow))
+            self._trim(now)
+            if len(self._calls) < self.policy['min_calls']:
+                return
+            failure_rate, slow_rate = self._rates()
+            if failure_rate >= self.policy['failure_rate']:
+                self._transition(OPEN, f"{failure_rate:.0%} of calls failed")
+            elif slow_rate >= self.policy['slow_rate']:
+                self._transition(OPEN, f"{slow_rate:.0%} of calls slower than {self.policy['slow_call']}s")
+
+    def available(self):
+        """
+        False while the circuit is open (calls would be rejected).
+        """
+        with self._lock:
+            return self.state != OPEN
+
+    def status(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            failure_rate, slow_rate = self._rates()
+            status = {
+                'state': self.state,
+                'calls': len(self._calls),
+                'failure_rate': round(failure_rate, 3),
+                'slow_rate': round(slow_rate, 3),
+            }
+            if self.state == OPEN:
+                status['retry_in'] = round(max(0.0, self._opened_at + self.policy['open_seconds'] - time.monotonic()), 1)
+            return status
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(provider):
+    """
+    Return the shared CircuitBreaker for `provider`, or None if breakers are disabled.
+    """
+    if not CIRCUIT_BREAKERS_ENABLED:
+        return None
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider, CIRCUIT_BREAKERS.get(provider, DEFAULT_BREAKER))
+        return _breakers[provider]
+
+def available(provider):
+    """
+    False while `provider`'s circuit is open.
+    """
+    breaker = get_breaker(provider)
+    return breaker is None or breaker.available()
+
+def status():
+    """
+    Return {provider: breaker status} for every configured provider.
+    """
+    return {provider: get_breaker(provider).status() for provider in CIRCUIT_BREAKERS} if CIRCUIT_BREAKERS_ENABLED else {}
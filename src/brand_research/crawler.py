@@ -0,0 +1,165 @@
+# src/brand_research/crawler.py
+#
+# Bounded contact-page crawler used to find a company's email addresses.
+#
+# A company's homepage rarely lists emails, so besides the homepage the
+# crawler fetches the pages that usually do (/contact, /about, /team, /press)
+# and any same-site link whose text or URL says "contact". All of them are
+# fetched concurrently, so a crawl takes about as long as its slowest page
+# rather than the sum of them. Every crawl is bounded by:
+#
+#   - CRAWL_PAGE_BUDGET:      pages fetched per site
+#   - CRAWL_MAX_DEPTH:        links followed from the homepage (1 = its links only)
+#   - CRAWL_HOST_CONCURRENCY: pages fetched at once from one host, across all crawls
+#   - CRAWL_MAX_BYTES:        bytes read from one page
+#   - CRAWL_TIME_BUDGET:      seconds per crawl; it returns what it has found by then
+#
+# Pages go through the shared HTTP client and resilience.call('crawler', ...).
+
+import os
+import re
+import time
+import asyncio
+import logging
+import weakref
+from urllib.parse import urljoin, urlsplit, urldefrag
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+from . import metrics, resilience
+from .runtime import loop_local
+from .http_client import get_async_client
+
+# Load environment variables
+load_dotenv()
+
+CRAWL_PAGE_BUDGET = int(os.getenv('CRAWL_PAGE_BUDGET', 8))
+CRAWL_MAX_DEPTH = int(os.getenv('CRAWL_MAX_DEPTH', 1))
+CRAWL_HOST_CONCURRENCY = int(os.getenv('CRAWL_HOST_CONCURRENCY', 6))
+CRAWL_MAX_BYTES = int(os.getenv('CRAWL_MAX_BYTES', 1024 * 1024))
+CRAWL_TIME_BUDGET = float(os.getenv('CRAWL_TIME_BUDGET', 10))
+
+# Fetched along with the homepage, as if linked from it
+CONTACT_PATHS = ('/contact', '/about', '/team', '/press')
+CONTACT_LINK_PATTERN = re.compile(r'contact', re.IGNORECASE)
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+# Retina image names (logo@2x.png) look like emails
+NOT_EMAIL_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')
+
+logger = logging.getLogger(__name__)
+
+
+def _site(host):
+    # www.example.com and example.com are the same site
+    host = (host or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def _host_semaphore(host):
+    # Shared by all crawls on this event loop; dropped once no crawl holds it
+    semaphores = loop_local('crawler-hosts', weakref.WeakValueDictionary)
+    semaphore = semaphores.get(host)
+    if semaphore is None:
+        semaphore = semaphores[host] = asyncio.Semaphore(CRAWL_HOST_CONCURRENCY)
+    return semaphore
+
+def _emails(soup):
+    # Addresses in the page text and in mailto: links, in page order
+    found = EMAIL_PATTERN.findall(soup.get_text(' '))
+    for link in soup.find_all('a', href=True):
+        if link['href'].lower().startswith('mailto:'):
+            found += EMAIL_PATTERN.findall(link['href'][len('mailto:'):].split('?')[0])
+    return [email for email in found if not email.lower().endswith(NOT_EMAIL_SUFFIXES)]
+
+def _contact_links(soup, base_url):
+    links = []
+    for link in soup.find_all('a', href=True):
+        if CONTACT_LINK_PATTERN.search(link.get_text()) or CONTACT_LINK_PATTERN.search(link['href']):
+            url = urldefrag(urljoin(base_url, link['href']))[0]
+            if urlsplit(url).scheme in ('http', 'https'):
+                links.append(url)
+    return links
+
+def _parse_page(page):
+    # Returns (emails, contact links) for a fetched (url, html) page
+    final_url, html = page
+    soup = BeautifulSoup(html, 'html.parser')
+    return _emails(soup), _contact_links(soup, final_url)
+
+async def _fetch(url):
+    # Returns (final url, html), or None for pages that are not HTML
+    async def request():
+        async with get_async_client().stream('GET', url, follow_redirects=True) as response:
+            response.raise_for_status()
+            if 'html' not in response.headers.get('content-type', 'text/html'):
+                return None
+            body = b''
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= CRAWL_MAX_BYTES:
+                    metrics.increment('crawler.truncated')
+                    break
+            return str(response.url), body.decode(response.encoding or 'utf-8', errors='replace')
+
+    return await resilience.call('crawler', request)
+
+async def crawl_emails(url):
+    """
+    Crawl a company site from `url` and return the deduplicated email
+    addresses found on its homepage and contact pages, in the order found.
+    """
+    if '://' not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    home = f"{parts.scheme}://{parts.netloc}/"
+    site = _site(parts.hostname)
+    semaphore = _host_semaphore(parts.hostname)
+
+    emails = {}
+    seen = set()
+    tasks = set()
+
+    def schedule(page_url, depth):
+        page_url = page_url.rstrip('/') or page_url
+        if page_url in seen or len(seen) >= CRAWL_PAGE_BUDGET or depth > CRAWL_MAX_DEPTH:
+            return
+        if _site(urlsplit(page_url).hostname) != site:
+            return
+        seen.add(page_url)
+        task = asyncio.ensure_future(visit(page_url, depth))
+        tasks.add(task)
+
+    async def visit(page_url, depth):
+        try:
+            async with semaphore:
+                page = await _fetch(page_url)
+        except Exception as e:
+            metrics.increment('crawler.pages.failed')
+            logger.info(f"Skipping {page_url}: {str(e)}")
+            return
+        metrics.increment('crawler.pages.fetched')
+        if page is None:
+            return
+        found, links = await asyncio.to_thread(_parse_page, page)
+        for email in found:
+            emails.setdefault(email.lower(), email)
+        for link in links:
+            schedule(link, depth + 1)
+
+    schedule(url, 0)
+    schedule(home, 0)
+    for path in CONTACT_PATHS:
+        schedule(urljoin(home, path), 1)
+
+    stop_at = time.monotonic() + CRAWL_TIME_BUDGET
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(tasks, timeout=stop_at - time.monotonic(), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                metrics.increment('crawler.time_budget_exceeded')
+                break
+            tasks -= done
+    finally:
+        for task in tasks:
+            task.cancel()
+    metrics.observe('crawler.pages_per_site', len(seen), buckets=(1, 2, 4, 8, 16, 32))
+    return list(emails.values())
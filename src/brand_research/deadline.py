@@ -0,0 +1,105 @@
+# src/brand_research/deadline.py
+#
+# Request deadlines. research_brand sets an overall deadline, and every
+# provider call made on its behalf (in any task it starts) caps its timeout
+# to the time left, so one slow provider cannot push a request past its SLO.
+# Stages check has_budget() to degrade (skip work) when time runs low.
+
+import time
+import asyncio
+import contextlib
+import contextvars
+from . import metrics
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised instead of starting (or while waiting for) work the deadline leaves no time for.
+    """
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+_current = contextvars.ContextVar('research_deadline', default=None)
+
+
+def current_deadline():
+    return _current.get()
+
+def remaining():
+    """
+    Seconds left before the current deadline, or None if there is none.
+    """
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+def has_budget(seconds):
+    """
+    True if there is no deadline or at least `seconds` are left.
+    """
+    left = remaining()
+    return left is None or left >= seconds
+
+def cap_timeout(timeout, name=None):
+    """
+    Return `timeout` capped to the time left. Raises DeadlineExceeded if none is left.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        metrics.increment(f"deadline.exceeded.{name}" if name else 'deadline.exceeded')
+        raise DeadlineExceeded(f"Deadline exceeded before {name or 'call'}")
+    return min(timeout, left) if timeout else left
+
+async def wait_for(aw, name=None):
+    """
+    Await `aw`, giving up with DeadlineExceeded when the current deadline passes.
+    """
+    if remaining() is None:
+        return await aw
+    try:
+        timeout = cap_timeout(None, name)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise
+    try:
+        return await asyncio.wait_for(aw, timeout)
+    except asyncio.TimeoutError:
+        if has_budget(0.001):
+            raise
+        metrics.increment(f"deadline.exceeded.{name}" if name else 'deadline.exceeded')
+        raise DeadlineExceeded(f"Deadline exceeded waiting for {name or 'call'}")
+
+@contextlib.contextmanager
+def deadline_scope(seconds):
+    """
+    Set a deadline `seconds` from now for the code in the block (and the
+    tasks it creates). A surrounding deadline that is sooner still applies.
+    With seconds=None the block keeps whatever deadline is already set.
+    """
+    outer = _current.get()
+    if seconds is None or (outer is not None and outer.remaining() <= seconds):
+        yield outer
+        return
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # An async generator finalised from another task
+            _current.set(outer)
@@ -1,14 +1,13 @@
 import os
 from dotenv import load_dotenv
-import openai
-import requests
-from .brand_research import categorize_emails
+from .similar_brands import categorize_emails
+from .http_client import get_client
+from .llm import chat_completion
 
 # Load environment variables
 load_dotenv()
 
 # Set up API keys
-openai.api_key = os.getenv('OPENAI_API_KEY')
 HUNTER_API_KEY = os.getenv('HUNTER_API_KEY')
 
 def get_enhanced_similar_brands(brand_name):
@@ -17,15 +16,12 @@ def get_enhanced_similar_brands(brand_name):
     """
     prompt = f"List 5 companies similar to {brand_name} in the same industry. Provide the response as a comma-separated list."
     
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that provides information about companies and industries."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    content = chat_completion('similar_brands', [
+        {"role": "system", "content": "You are a helpful assistant that provides information about companies and industries."},
+        {"role": "user", "content": prompt}
+    ])
     
-    similar_brands = response.choices[0].message['content'].strip().split(', ')
+    similar_brands = content.split(', ')
     return similar_brands[:5]  # Ensure we only return 5 brands
 
 def get_industry(brand_name):
@@ -34,23 +30,18 @@ def get_industry(brand_name):
     """
     prompt = f"What industry is {brand_name} primarily operating in? Provide a one-word answer."
     
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that provides information about companies and industries."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    
-    return response.choices[0].message['content'].strip()
+    return chat_completion('industry', [
+        {"role": "system", "content": "You are a helpful assistant that provides information about companies and industries."},
+        {"role": "user", "content": prompt}
+    ])
 
 def find_company_emails(domain):
     """
     Use Hunter.io to find email addresses for a company
     """
-    url = f"https://api.hunter.io/v2/domain-search?domain={domain}&api_key={HUNTER_API_KEY}"
+    url = "https://api.hunter.io/v2/domain-search"
     
-    response = requests.get(url)
+    response = get_client().get(url, params={'domain': domain, 'api_key': HUNTER_API_KEY})
     data = response.json()
     
     if 'data' in data and 'emails' in data['data']:
@@ -72,15 +63,10 @@ def generate_tailored_email(user_company_info, recipient_company, outreach_goal,
     The email should be concise, friendly, and tailored to the recipient company.
     """
     
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a professional email writer, crafting personalized outreach emails for business collaborations."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    
-    return response.choices[0].message['content'].strip()
+    return chat_completion('drafting', [
+        {"role": "system", "content": "You are a professional email writer, crafting personalized outreach emails for business collaborations."},
+        {"role": "user", "content": prompt}
+    ])
 
 def enhanced_research_brand(brand_name, user_company_info, outreach_goal, cta):
     """
@@ -94,8 +80,8 @@ def enhanced_research_brand(brand_name, user_company_info, outreach_goal, cta):
     }
 
     for brand in similar_brands:
-        # Fix: Use double quotes for the f-string to avoid issues with apostrophes
-        domain = f"www.{brand.lower().replace(' ', '').replace('''', '')}.com"
+        name = brand.lower().replace(' ', '').replace("'", '')
+        domain = f"www.{name}.com"
         emails = find_company_emails(domain)
         tailored_email = generate_tailored_email(user_company_info, brand, outreach_goal, cta)
         results[brand] = {
@@ -0,0 +1,87 @@
+# src/brand_research/http_client.py
+#
+# Shared HTTP clients for every outbound call in the research modules.
+#
+# Connections are kept alive and reused, so repeated calls to the same
+# provider skip the TCP and TLS handshakes. Each known provider host gets
+# its own connection pool (sized by HTTP_HOST_LIMITS) so one busy provider
+# cannot starve the others, and every request has a default timeout.
+# Failed connection attempts are retried by the transport; retrying on HTTP
+# status codes is done by resilience.call. Responses from the async client
+# feed the providers' rate-limit headers to the ratelimit module.
+#
+#   - get_async_client(): httpx.AsyncClient for the running event loop
+#   - get_client():       thread-safe httpx.Client for synchronous code
+
+import os
+import json
+import threading
+import httpx
+from dotenv import load_dotenv
+from .runtime import loop_local
+from . import ratelimit
+
+# Load environment variables
+load_dotenv()
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 15))
+# Connection pool for hosts without their own entry in HTTP_HOST_LIMITS
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 100))
+HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', 60))
+# Connection attempts retried by the transport (connect errors only)
+HTTP_CONNECT_RETRIES = int(os.getenv('HTTP_CONNECT_RETRIES', 2))
+# Maximum connections per provider host; override with e.g. HTTP_HOST_LIMITS='{"api.hunter.io": 4}'
+HTTP_HOST_LIMITS = {
+    'api.openai.com': 50,
+    'api.hunter.io': 10,
+    'serpapi.com': 10,
+}
+HTTP_HOST_LIMITS.update(json.loads(os.getenv('HTTP_HOST_LIMITS', '{}')))
+USER_AGENT = 'HustlerAI/1.0 (+brand research)'
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _timeout():
+    return httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+def _limits(max_connections, max_keepalive):
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+def _client_options(transport_class, **options):
+    mounts = {
+        f"all://{host}": transport_class(limits=_limits(limit, limit), retries=HTTP_CONNECT_RETRIES)
+        for host, limit in HTTP_HOST_LIMITS.items()
+    }
+    return {
+        'timeout': _timeout(),
+        'headers': {'User-Agent': USER_AGENT},
+        'transport': transport_class(limits=_limits(HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE), retries=HTTP_CONNECT_RETRIES),
+        'mounts': mounts,
+        **options,
+    }
+
+def get_async_client():
+    """
+    Return the shared httpx.AsyncClient for the running event loop.
+    """
+    return loop_local('http-client', lambda: httpx.AsyncClient(**_client_options(
+        httpx.AsyncHTTPTransport, event_hooks={'response': [ratelimit.observe_response]}
+    )))
+
+def get_client():
+    """
+    Return the shared synchronous httpx.Client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(**_client_options(httpx.HTTPTransport))
+        return _client
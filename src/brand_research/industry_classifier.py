@@ -0,0 +1,209 @@
+# src/brand_research/industry_classifier.py
+#
+# Local industry classifier: TF-IDF features of a brand's name, website and
+# description fed to a logistic regression, trained offline from the
+# industries the LLM has given us (recorded in the brand index).
+#
+# get_industry asks it first and only calls OpenAI when its confidence is
+# below INDUSTRY_MODEL_THRESHOLD. Train or refresh the model with:
+#
+#   python -m src.brand_research.industry_classifier
+#
+# Running workers pick up a refreshed model file within INDUSTRY_MODEL_RELOAD_INTERVAL.
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import logging
+from collections import Counter
+import joblib
+from sklearn.pipeline import Pipeline, FeatureUnion
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from dotenv import load_dotenv
+from . import metrics
+from .canonical import get_brand_index
+
+# Load environment variables
+load_dotenv()
+
+INDUSTRY_MODEL_ENABLED = os.getenv('INDUSTRY_MODEL_ENABLED', 'true').lower() == 'true'
+INDUSTRY_MODEL_PATH = os.getenv('INDUSTRY_MODEL_PATH', 'hustler_industry.joblib')
+# Minimum predicted probability for the local answer to be used instead of the LLM
+INDUSTRY_MODEL_THRESHOLD = float(os.getenv('INDUSTRY_MODEL_THRESHOLD', 0.75))
+# Don't train on fewer examples than this, or on industries seen fewer than twice
+INDUSTRY_MODEL_MIN_EXAMPLES = int(os.getenv('INDUSTRY_MODEL_MIN_EXAMPLES', 50))
+INDUSTRY_MODEL_MIN_CLASS_SIZE = 2
+# How often (seconds) a worker checks the model file for a newer version
+INDUSTRY_MODEL_RELOAD_INTERVAL = int(os.getenv('INDUSTRY_MODEL_RELOAD_INTERVAL', 60))
+
+logger = logging.getLogger(__name__)
+
+
+def brand_text(name, domain=None, description=None):
+    """
+    The text the classifier sees for a brand.
+    """
+    return ' '.join(part for part in (name, domain, description) if part)
+
+def normalize_industry(industry):
+    """
+    Normalise an LLM industry answer so 'sportswear.' and 'Sportswear' are one class.
+    """
+    return industry.strip().strip('."\'').title()
+
+def build_model():
+    return Pipeline([
+        ('features', FeatureUnion([
+            ('words', TfidfVectorizer(sublinear_tf=True)),
+            ('chars', TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), sublinear_tf=True)),
+        ])),
+        ('classifier', LogisticRegression(max_iter=1000, C=5.0)),
+    ])
+
+def _examples(rows):
+    texts, labels = [], []
+    for name, domain, description, industry in rows:
+        if industry and industry.strip() and industry.strip().lower() != 'unknown':
+            texts.append(brand_text(name, domain, description))
+            labels.append(normalize_industry(industry))
+    counts = Counter(labels)
+    keep = [i for i, label in enumerate(labels) if counts[label] >= INDUSTRY_MODEL_MIN_CLASS_SIZE]
+    return [texts[i] for i in keep], [labels[i] for i in keep]
+
+def train(rows, threshold=INDUSTRY_MODEL_THRESHOLD):
+    """
+    Train a model on (name, domain, description, industry) rows. Returns
+    (model, report), where the report gives the accuracy and the share of
+    brands answered locally at `threshold` on a held-out fifth of the data.
+    """
+    texts, labels = _examples(rows)
+    classes = sorted(set(labels))
+    if len(texts) < INDUSTRY_MODEL_MIN_EXAMPLES or len(classes) < 2:
+        raise ValueError(f"Not enough training data: {len(texts)} usable examples in {len(classes)} industries")
+
+    report = {'examples': len(texts), 'industries': len(classes), 'threshold': threshold}
+    try:
+        train_texts, test_texts, train_labels, test_labels = train_test_split(
+            texts, labels, test_size=0.2, stratify=labels, random_state=0
+        )
+    except ValueError:
+        # Too few examples per industry for a stratified split
+        train_texts, test_texts, train_labels, test_labels = texts, [], labels, []
+    if test_texts and len(set(train_labels)) > 1:
+        model = build_model().fit(train_texts, train_labels)
+        probabilities = model.predict_proba(test_texts)
+        predictions = model.classes_[probabilities.argmax(axis=1)]
+        confident = probabilities.max(axis=1) >= threshold
+        report['accuracy'] = float((predictions == test_labels).mean())
+        report['coverage'] = float(confident.mean())
+        report['confident_accuracy'] = float((predictions == test_labels)[confident].mean()) if confident.any() else None
+
+    return build_model().fit(texts, labels), report
+
+def save(model, report, path=INDUSTRY_MODEL_PATH):
+    # Write to a temporary file first so workers never load a half-written model
+    tmp_path = f"{path}.tmp"
+    joblib.dump({'model': model, 'report': report, 'trained_at': time.time()}, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class IndustryClassifier:
+    """
+    Loads the trained model from `path` and reloads it when the file changes.
+    """
+
+    def __init__(self, path=INDUSTRY_MODEL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._model = None
+        self._mtime = None
+        self._checked_at = 0
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if self._checked_at and now - self._checked_at < INDUSTRY_MODEL_RELOAD_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            self._model = joblib.load(self.path)['model']
+            self._mtime = mtime
+            logger.info(f"Loaded industry model from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load industry model from {self.path}: {str(e)}")
+
+    def predict(self, name, domain=None, description=None):
+        """
+        Return (industry, confidence), or (None, 0.0) if no model is trained yet.
+        """
+        with self._lock:
+            self._maybe_reload()
+            model = self._model
+        if model is None:
+            return None, 0.0
+        probabilities = model.predict_proba([brand_text(name, domain, description)])[0]
+        best = probabilities.argmax()
+        return str(model.classes_[best]), float(probabilities[best])
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_industry_classifier():
+    """
+    Return the shared IndustryClassifier.
+    """
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = IndustryClassifier()
+        return _classifier
+
+def classify_industry(name, domain=None, description=None):
+    """
+    Return the locally predicted industry of a brand if the classifier is
+    confident enough, else None (the caller should ask the LLM).
+    """
+    if not INDUSTRY_MODEL_ENABLED:
+        return None
+    try:
+        industry, confidence = get_industry_classifier().predict(name, domain, description)
+    except Exception as e:
+        logger.warning(f"Industry classifier failed for {name}: {str(e)}")
+        return None
+    if industry is None:
+        return None
+    metrics.observe('industry.classifier.confidence', confidence, buckets=(0.25, 0.5, 0.6, 0.7, 0.75, 0.8, 0.9, 0.95))
+    if confidence < INDUSTRY_MODEL_THRESHOLD:
+        metrics.increment('industry.classifier.low_confidence')
+        return None
+    metrics.increment('industry.classifier.llm_skipped')
+    return industry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the local industry classifier from the brand index.")
+    parser.add_argument('--output', default=INDUSTRY_MODEL_PATH, help="Where to write the model")
+    parser.add_argument('--threshold', type=float, default=INDUSTRY_MODEL_THRESHOLD, help="Confidence threshold to evaluate")
+    args = parser.parse_args(argv)
+
+    try:
+        model, report = train(get_brand_index().labeled_brands(), args.threshold)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    save(model, report, args.output)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
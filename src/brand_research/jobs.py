@@ -0,0 +1,164 @@
+# src/brand_research/jobs.py
+#
+# Background research jobs. The web app enqueues a job and polls its status
+# instead of running the whole pipeline inside the request thread.
+#
+# Backends:
+#   - 'celery'    : jobs go to the broker at CELERY_BROKER_URL and are run by
+#                   any number of workers started with
+#                   `celery -A src.brand_research.jobs worker`
+#   - 'inprocess' : jobs run on a thread pool inside the web process (no broker
+#                   needed, handy for development and tests). Only the worker
+#                   that ran a job knows it, so the web app only queues jobs
+#                   by default with Celery (see RESEARCH_MODE in web/app.py).
+
+import os
+import time
+import uuid
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from celery import Celery
+from dotenv import load_dotenv
+from .brand_research import research_brand
+
+# Load environment variables
+load_dotenv()
+
+RESEARCH_JOB_BACKEND = os.getenv('RESEARCH_JOB_BACKEND', 'inprocess')
+RESEARCH_JOB_WORKERS = int(os.getenv('RESEARCH_JOB_WORKERS', 4))
+# How long finished jobs are kept (seconds)
+RESEARCH_JOB_TTL = int(os.getenv('RESEARCH_JOB_TTL', 3600))
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+
+logger = logging.getLogger(__name__)
+
+celery_app = Celery('hustler_ai', broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
+celery_app.conf.update(
+    task_track_started=True,
+    result_expires=RESEARCH_JOB_TTL,
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+)
+
+# Job states reported by every backend
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def run_research_job(brand_name, user_company_info, outreach_goal, desired_cta, deadline=None):
+    """
+    Run a research job and return what the results page needs to render it.
+    `deadline` (seconds) bounds the research once the job starts.
+    """
+    results = research_brand(brand_name, user_company_info, outreach_goal, desired_cta, deadline=deadline)
+    return {'brand_name': brand_name, 'results': results}
+
+research_task = celery_app.task(name='research_brand')(run_research_job)
+
+
+class InProcessJobBackend:
+    """
+    Runs research jobs on a local thread pool and keeps their status in memory.
+    """
+
+    def __init__(self, max_workers=RESEARCH_JOB_WORKERS, ttl=RESEARCH_JOB_TTL):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='research-job')
+        self._ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, brand_name, user_company_info, outreach_goal, desired_cta, deadline=None):
+        job_id = uuid.uuid4().hex
+        job = {'state': PENDING, 'result': None, 'error': None, 'finished_at': None}
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job, brand_name, user_company_info, outreach_goal, desired_cta, deadline)
+        return job_id
+
+    def _run(self, job, *args):
+        job['state'] = RUNNING
+        try:
+            job['result'] = run_research_job(*args)
+            job['state'] = DONE
+        except Exception as e:
+            logger.error(f"Research job failed: {str(e)}", exc_info=True)
+            job['error'] = str(e)
+            job['state'] = FAILED
+        job['finished_at'] = time.monotonic()
+
+    def _prune(self):
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and now - job['finished_at'] > self._ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {'job_id': job_id, 'state': job['state'], 'result': job['result'], 'error': job['error']}
+
+
+class CeleryJobBackend:
+    """
+    Sends research jobs to Celery workers through the configured broker.
+    """
+
+    _STATES = {
+        'PENDING': PENDING,
+        'RECEIVED': PENDING,
+        'RETRY': PENDING,
+        'STARTED': RUNNING,
+        'SUCCESS': DONE,
+        'FAILURE': FAILED,
+        'REVOKED': FAILED,
+    }
+
+    def submit(self, brand_name, user_company_info, outreach_goal, desired_cta, deadline=None):
+        return research_task.delay(brand_name, user_company_info, outreach_goal, desired_cta, deadline).id
+
+    def status(self, job_id):
+        # Celery reports unknown ids as PENDING, so this never returns None
+        async_result = celery_app.AsyncResult(job_id)
+        state = self._STATES.get(async_result.state, PENDING)
+        return {
+            'job_id': job_id,
+            'state': state,
+            'result': async_result.result if state == DONE else None,
+            'error': str(async_result.result) if state == FAILED else None,
+        }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_job_backend():
+    """
+    Return the job backend selected by RESEARCH_JOB_BACKEND.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if RESEARCH_JOB_BACKEND == 'celery':
+                _backend = CeleryJobBackend()
+            elif RESEARCH_JOB_BACKEND == 'inprocess':
+                _backend = InProcessJobBackend()
+            else:
+                raise ValueError(f"Unknown RESEARCH_JOB_BACKEND: {RESEARCH_JOB_BACKEND}")
+        return _backend
+
+def set_job_backend(backend):
+    """
+    Replace the job backend, e.g. with an InProcessJobBackend in tests.
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
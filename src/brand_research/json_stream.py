@@ -0,0 +1,67 @@
+# src/brand_research/json_stream.py
+#
+# Incremental parser for JSON arriving in chunks (e.g. a streamed OpenAI
+# completion). It hands back each object that is an element of an array as
+# soon as its closing brace arrives, so callers can start working on the
+# first items of a list before the rest has been generated.
+
+import json
+
+
+class JSONArrayItemParser:
+    """
+    Feed text chunks with feed(); each call returns the objects that were
+    completed by that chunk. Only objects that are direct elements of an
+    array are returned, and objects nested inside them are returned as part
+    of their parent, e.g. for '{"industry": "x", "brands": [{...}, {...}]}'
+    each element of "brands" is returned once it is complete.
+
+    Text outside the JSON value (such as markdown code fences) is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._length = 0
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._item_start = None
+        self._item_depth = None
+
+    def feed(self, text):
+        items = []
+        for char in text:
+            position = self._length
+            self._buffer.append(char)
+            self._length += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if char == '{' and self._item_start is None and self._stack and self._stack[-1] == '[':
+                    self._item_start = position
+                    self._item_depth = len(self._stack)
+                self._stack.append(char)
+            elif char in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if char == '}' and self._item_start is not None and len(self._stack) == self._item_depth:
+                    items.append(json.loads(''.join(self._buffer[self._item_start:position + 1])))
+                    self._item_start = None
+                    self._item_depth = None
+        return items
+
+    def text(self):
+        """
+        Everything fed so far.
+        """
+        return ''.join(self._buffer)
@@ -0,0 +1,248 @@
+# src/brand_research/llm.py
+#
+# Shared OpenAI chat-completion helper used by every module that talks to the
+# LLM. Each stage is routed to a model with its own sampling limits and
+# latency budget, and responses are cached per stage, keyed on a hash of the
+# model, the messages and the sampling parameters.
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+from . import metrics, resilience, circuit
+from .deadline import DeadlineExceeded, wait_for
+from .cache import ProviderCache, get_cache_backend
+from .runtime import run_sync, loop_local
+from .singleflight import SingleFlight
+from .http_client import get_async_client
+
+# Load environment variables
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+DEFAULT_MODEL = "gpt-3.5-turbo"
+FALLBACK_MODEL = os.getenv('LLM_FALLBACK_MODEL', 'gpt-4o-mini')
+
+# Model routing per stage. `timeout` is the latency budget in seconds for
+# each attempt: when the primary model still errors after resilience retries
+# or overruns it, the call is retried once on `fallback_model`. max_tokens/temperature of None use the API defaults.
+# Override with e.g. LLM_ROUTES='{"drafting": {"model": "gpt-4o", "timeout": 45}}'
+LLM_ROUTES = {
+    'industry': {'model': DEFAULT_MODEL, 'fallback_model': FALLBACK_MODEL, 'max_tokens': 16, 'temperature': 0, 'timeout': 5},
+    'similar_brands': {'model': DEFAULT_MODEL, 'fallback_model': FALLBACK_MODEL, 'max_tokens': 600, 'temperature': 0.3, 'timeout': 15},
+    'discovery': {'model': DEFAULT_MODEL, 'fallback_model': FALLBACK_MODEL, 'max_tokens': 800, 'temperature': 0.3, 'timeout': 20},
+    'drafting': {'model': DEFAULT_MODEL, 'fallback_model': FALLBACK_MODEL, 'max_tokens': 700, 'temperature': 0.7, 'timeout': 30},
+}
+LLM_DEFAULT_ROUTE = {'model': DEFAULT_MODEL, 'fallback_model': FALLBACK_MODEL, 'max_tokens': None, 'temperature': None, 'timeout': 30}
+for _stage, _overrides in json.loads(os.getenv('LLM_ROUTES', '{}')).items():
+    LLM_ROUTES[_stage] = {**LLM_ROUTES.get(_stage, LLM_DEFAULT_ROUTE), **_overrides}
+
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND')  # defaults to CACHE_BACKEND
+# Cache TTL in seconds per stage; override with e.g. LLM_CACHE_TTLS='{"drafting": 600}'
+LLM_CACHE_TTLS = {
+    'discovery': 7 * 24 * 3600,
+    'similar_brands': 7 * 24 * 3600,
+    'industry': 30 * 24 * 3600,
+    'drafting': 24 * 3600,
+}
+LLM_CACHE_TTLS.update(json.loads(os.getenv('LLM_CACHE_TTLS', '{}')))
+LLM_CACHE_DEFAULT_TTL = 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+_caches = {}
+_flight = SingleFlight('llm')
+_STREAM_END = object()
+
+
+def get_openai_client():
+    """
+    Return the AsyncOpenAI client for the running event loop. It shares the
+    loop's pooled HTTP client; retries are done by resilience.call, so the
+    client's own are disabled.
+    """
+    return loop_local('openai', lambda: AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0, http_client=get_async_client()))
+
+async def _health_probe():
+    # Listing models is free and exercises the same API host and key
+    await get_openai_client().models.list()
+
+circuit.register_probe('openai', _health_probe)
+
+def get_llm_cache(stage):
+    """
+    Return the response cache for a stage.
+    """
+    if stage not in _caches:
+        _caches[stage] = ProviderCache(
+            f"llm:{stage}",
+            get_cache_backend(LLM_CACHE_BACKEND),
+            ttl=LLM_CACHE_TTLS.get(stage, LLM_CACHE_DEFAULT_TTL)
+        )
+    return _caches[stage]
+
+def cache_key(model, messages, params):
+    payload = json.dumps({'model': model, 'messages': messages, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_route(stage):
+    """
+    Return the model route for a stage.
+    """
+    return LLM_ROUTES.get(stage, LLM_DEFAULT_ROUTE)
+
+def _resolve(stage, model, params):
+    # Explicit arguments win over the stage's route
+    route = get_route(stage)
+    resolved = {name: route[name] for name in ('max_tokens', 'temperature') if route.get(name) is not None}
+    resolved.update(params)
+    return model or route['model'], resolved
+
+async def _create(stage, messages, model, params, timeout=None, **extra):
+    """
+    Call the API on `model`, falling back to the stage's fallback model when
+    it errors or does not answer within `timeout` (defaults to the stage's
+    latency budget). For a streamed call the budget covers the time until the
+    stream opens.
+    """
+    route = get_route(stage)
+    timeout = timeout or route['timeout']
+    models = [model]
+    if route.get('fallback_model') and route['fallback_model'] != model:
+        models.append(route['fallback_model'])
+
+    for attempt, candidate in enumerate(models):
+        started = time.monotonic()
+        try:
+            response = await resilience.call(
+                'openai',
+                lambda: get_openai_client().chat.completions.create(model=candidate, messages=messages, **params, **extra),
+                operation=stage,
+                timeout=timeout
+            )
+            metrics.observe(f"llm.{stage}.latency", time.monotonic() - started)
+            return response
+        except Exception as e:
+            # The fallback model has the same deadline and is served by the same provider
+            if attempt == len(models) - 1 or isinstance(e, (DeadlineExceeded, circuit.CircuitOpenError)):
+                raise
+            reason = 'timeout' if isinstance(e, asyncio.TimeoutError) else 'error'
+            detail = f"over its {timeout}s budget" if reason == 'timeout' else str(e)
+            metrics.increment(f"llm.{stage}.fallback.{reason}")
+            logger.warning(f"{candidate} failed for {stage} ({detail}), falling back to {models[attempt + 1]}")
+
+async def chat_completion_async(stage, messages, model=None, timeout=None, **params):
+    """
+    Return the stripped content of a chat completion for `messages`.
+    `stage` names the pipeline step (e.g. 'industry', 'drafting') and selects
+    its model route and cache TTL. `model`, `timeout` and `params` override the route.
+    """
+    model, params = _resolve(stage, model, params)
+    cache = get_llm_cache(stage) if LLM_CACHE_ENABLED else None
+    key = cache_key(model, messages, params)
+    if cache is not None:
+        entry = await cache.get_entry_async(key)
+        if entry is not None:
+            return entry['value']
+
+    async def complete():
+        response = await _create(stage, messages, model, params, timeout)
+        content = response.choices[0].message.content.strip()
+        if cache is not None:
+            await cache.set_async(key, content)
+        return content
+
+    # Identical prompts already in flight share one completion
+    return await _flight.do(key, complete)
+
+async def stream_chat_completion_async(stage, messages, model=None, timeout=None, **params):
+    """
+    Async generator yielding the text of a chat completion as it is generated
+    (stream=True). A cached answer is yielded in one piece. The full text is
+    cached once the stream completes, under the same key as chat_completion_async.
+
+    Identical calls in flight share one completion with each other and with
+    chat_completion_async: the caller that starts it gets the text as it
+    streams, the others get the full text in one piece when it completes.
+    The completion runs to the end even if its caller stops reading, so
+    the others still get it (and it is cached).
+    """
+    model, params = _resolve(stage, model, params)
+    cache = get_llm_cache(stage) if LLM_CACHE_ENABLED else None
+    key = cache_key(model, messages, params)
+    if cache is not None:
+        entry = await cache.get_entry_async(key)
+        if entry is not None:
+            yield entry['value']
+            return
+
+    # Filled by complete() if this call leads; ends with _STREAM_END either way
+    pieces = asyncio.Queue()
+
+    async def complete():
+        stream = await _create(stage, messages, model, params, timeout, stream=True)
+        parts = []
+        chunks = stream.__aiter__()
+        try:
+            while True:
+                try:
+                    # The stream is read chunk by chunk so the deadline can interrupt it
+                    chunk = await wait_for(chunks.__anext__(), 'openai')
+                except StopAsyncIteration:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    pieces.put_nowait(chunk.choices[0].delta.content)
+        finally:
+            await stream.close()
+        content = ''.join(parts).strip()
+        if cache is not None:
+            await cache.set_async(key, content)
+        return content
+
+    flight = asyncio.ensure_future(_flight.do(key, complete))
+    flight.add_done_callback(lambda _: pieces.put_nowait(_STREAM_END))
+    streamed = False
+    try:
+        while (piece := await pieces.get()) is not _STREAM_END:
+            streamed = True
+            yield piece
+        content = await flight
+    finally:
+        flight.cancel()
+    if not streamed and content:
+        yield content
+
+async def cached_completion_async(stage, messages, model=None, **params):
+    """
+    Return the cached content for a chat completion, or None if it is not cached.
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    model, params = _resolve(stage, model, params)
+    return await get_llm_cache(stage).get_async(cache_key(model, messages, params))
+
+async def store_completion_async(stage, messages, content, model=None, **params):
+    """
+    Cache `content` as the answer to a chat completion obtained some other way (e.g. in a batch).
+    """
+    if LLM_CACHE_ENABLED:
+        model, params = _resolve(stage, model, params)
+        await get_llm_cache(stage).set_async(cache_key(model, messages, params), content)
+
+def chat_completion(stage, messages, model=None, timeout=None, **params):
+    """
+    Synchronous wrapper around chat_completion_async.
+    """
+    return run_sync(chat_completion_async(stage, messages, model, timeout, **params))
+
+def cache_stats():
+    """
+    Hit/miss stats for each stage cache used so far.
+    """
+    return {stage: cache.stats() for stage, cache in _caches.items()}
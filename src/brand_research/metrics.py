@@ -0,0 +1,91 @@
+# src/brand_research/metrics.py
+#
+# Minimal in-process metrics registry shared by the research modules.
+# Counters and histograms are exposed as JSON on the web app's /metrics endpoint.
+
+import bisect
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_histograms = {}
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with count, sum, min and max.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + ('+Inf',), self.bucket_counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else None,
+            'buckets': buckets,
+        }
+
+
+def increment(name, value=1):
+    """
+    Add `value` to the counter called `name`.
+    """
+    with _lock:
+        _counters[name] += value
+
+
+def get_counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS):
+    """
+    Record `value` in the histogram called `name` (created with `buckets` on first use).
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def snapshot():
+    """
+    Return a copy of all metrics.
+    """
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'histograms': {name: histogram.to_dict() for name, histogram in _histograms.items()},
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
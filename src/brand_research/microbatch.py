@@ -0,0 +1,80 @@
+# src/brand_research/microbatch.py
+#
+# Cross-request micro-batching for small LLM calls. Calls that arrive within
+# a short window (or until the batch is full) are answered together by one
+# batch function, and each caller gets its own answer back.
+#
+# Batches are collected per event loop. The synchronous research entry
+# points all run on the shared background loop, so concurrent web requests
+# end up in the same batches.
+
+import time
+import asyncio
+import logging
+from . import metrics
+from .runtime import loop_local
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+BATCH_WAIT_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25)
+
+
+class MicroBatcher:
+    """
+    Groups concurrent `submit(item)` calls into batches for `batch_fn`.
+
+    `batch_fn(items)` is a coroutine returning one result per item, in order.
+    A batch is sent `window` seconds after its first item arrives, or as soon
+    as it holds `max_batch_size` items. If `batch_fn` fails, every caller in
+    the batch gets the exception.
+    """
+
+    def __init__(self, name, batch_fn, window=0.005, max_batch_size=16):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+    def _state(self):
+        return loop_local(f"microbatch:{self.name}", lambda: {'pending': [], 'timer': None, 'tasks': set()})
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        state = self._state()
+        future = loop.create_future()
+        state['pending'].append((item, future, time.perf_counter()))
+        if len(state['pending']) >= self.max_batch_size:
+            self._flush(state)
+        elif state['timer'] is None:
+            state['timer'] = loop.call_later(self.window, self._flush, state)
+        return await future
+
+    def _flush(self, state):
+        if state['timer'] is not None:
+            state['timer'].cancel()
+            state['timer'] = None
+        batch, state['pending'] = state['pending'], []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            state['tasks'].add(task)
+            task.add_done_callback(state['tasks'].discard)
+
+    async def _run(self, batch):
+        sent_at = time.perf_counter()
+        metrics.observe(f"microbatch.{self.name}.batch_size", len(batch), BATCH_SIZE_BUCKETS)
+        for _, _, queued_at in batch:
+            metrics.observe(f"microbatch.{self.name}.wait_time", sent_at - queued_at, BATCH_WAIT_BUCKETS)
+        try:
+            results = await self.batch_fn([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch function returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.warning(f"Micro-batch {self.name} failed: {str(e)}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,259 @@
+# src/brand_research/pipeline.py
+#
+# Stage-pipelined executor for researching many seed brands at once.
+#
+#   discover -> resolve domain -> look up contacts -> draft email
+#
+# Each stage has its own pool of worker threads and a bounded queue in front
+# of it, so LLM-bound and Hunter-bound stages overlap across seed brands
+# instead of waiting on each other. A full queue blocks the stage feeding it,
+# which keeps memory bounded for large batches.
+
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import logging
+import argparse
+from .brand_research import discover_brand, guess_domain, find_company_emails, generate_tailored_email
+
+logger = logging.getLogger(__name__)
+
+# Default worker threads per stage and queue size between stages
+PIPELINE_WORKERS = {
+    'discover': int(os.getenv('PIPELINE_DISCOVER_WORKERS', 4)),
+    'resolve': int(os.getenv('PIPELINE_RESOLVE_WORKERS', 2)),
+    'contacts': int(os.getenv('PIPELINE_CONTACTS_WORKERS', 8)),
+    'draft': int(os.getenv('PIPELINE_DRAFT_WORKERS', 8)),
+}
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 100))
+
+_STOP = object()
+
+
+class Stage:
+    """
+    One pipeline stage: a bounded input queue served by a pool of worker threads.
+    `handler(item)` returns the items to pass on to the next stage.
+    """
+
+    def __init__(self, name, handler, workers, queue_size):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.next_stage = None
+        self.on_error = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._errors = 0
+        self._service_time = 0.0
+        self._max_service_time = 0.0
+        self._max_queue_depth = 0
+
+    def put(self, item):
+        self.queue.put(item)
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, self.queue.qsize())
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"pipeline-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            started = time.perf_counter()
+            try:
+                outputs = self.handler(item)
+                failed = False
+            except Exception as e:
+                logger.error(f"Error in pipeline stage {self.name}: {str(e)}", exc_info=True)
+                outputs = self.on_error(item) if self.on_error else []
+                failed = True
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._processed += 1
+                self._errors += failed
+                self._service_time += elapsed
+                self._max_service_time = max(self._max_service_time, elapsed)
+            for output in outputs:
+                self.next_stage.put(output)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self._max_queue_depth,
+                'processed': self._processed,
+                'errors': self._errors,
+                'avg_service_time': self._service_time / self._processed if self._processed else 0.0,
+                'max_service_time': self._max_service_time,
+            }
+
+
+class _Collector:
+    """
+    End of the pipeline: assembles per-seed results and signals when every seed is done.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self._pending_brands = {}
+        self._pending_seeds = 0
+        self._done = threading.Condition()
+
+    def add_seed(self):
+        with self._done:
+            self._pending_seeds += 1
+
+    def seed_discovered(self, seed, overview):
+        with self._done:
+            self.results[seed] = {seed: overview}
+            self._pending_brands[seed] = len(overview['similar_brands'])
+            if not overview['similar_brands']:
+                self._finish_seed(seed)
+
+    def put(self, item):
+        with self._done:
+            self.results[item['seed']][item['company']] = {
+                'domain': item['domain'],
+                'emails': item['emails'],
+                'tailored_email': item['tailored_email'],
+                'reason': item['reason']
+            }
+            self._pending_brands[item['seed']] -= 1
+            if self._pending_brands[item['seed']] == 0:
+                self._finish_seed(item['seed'])
+
+    def _finish_seed(self, seed):
+        self._pending_seeds -= 1
+        self._done.notify_all()
+
+    def seed_results(self, seed):
+        # Same order as research_brand: the seed first, then its similar brands
+        results = self.results[seed]
+        ordered = {seed: results[seed]}
+        for brand in results[seed]['similar_brands']:
+            ordered[brand['company']] = results[brand['company']]
+        return ordered
+
+    def wait(self):
+        with self._done:
+            self._done.wait_for(lambda: self._pending_seeds == 0)
+
+
+class ResearchPipeline:
+    """
+    Researches many seed brands at once with one worker pool per stage.
+    Produces the same per-seed result shape as research_brand.
+    """
+
+    def __init__(self, user_company_info, outreach_goal, desired_cta, workers=None, queue_size=PIPELINE_QUEUE_SIZE):
+        self.user_company_info = user_company_info
+        self.outreach_goal = outreach_goal
+        self.desired_cta = desired_cta
+        workers = {**PIPELINE_WORKERS, **(workers or {})}
+        self._collector = _Collector()
+        self.stages = [
+            Stage('discover', self._discover, workers['discover'], queue_size),
+            Stage('resolve', self._resolve, workers['resolve'], queue_size),
+            Stage('contacts', self._contacts, workers['contacts'], queue_size),
+            Stage('draft', self._draft, workers['draft'], queue_size),
+        ]
+        for stage, next_stage in zip(self.stages, self.stages[1:] + [self._collector]):
+            stage.next_stage = next_stage
+        self.stages[0].on_error = self._discover_failed
+        for stage in self.stages[1:]:
+            stage.on_error = lambda item: [item]
+
+    def _discover(self, seed):
+        similar_brands, industry = discover_brand(seed)
+        self._collector.seed_discovered(seed, {'similar_brands': similar_brands, 'industry': industry})
+        return [{
+            'seed': seed,
+            'company': brand['company'],
+            'reason': brand['reason'],
+            'domain': None,
+            'emails': [],
+            'tailored_email': "Error generating email"
+        } for brand in similar_brands]
+
+    def _discover_failed(self, seed):
+        self._collector.seed_discovered(seed, {'similar_brands': [], 'industry': "Unknown"})
+        return []
+
+    def _resolve(self, item):
+        item['domain'] = guess_domain(item['company'])
+        return [item]
+
+    def _contacts(self, item):
+        item['emails'] = find_company_emails(item['domain'])
+        return [item]
+
+    def _draft(self, item):
+        item['tailored_email'] = generate_tailored_email(self.user_company_info, item['company'], self.outreach_goal, self.desired_cta)
+        return [item]
+
+    def run(self, seed_brands):
+        """
+        Research every seed brand and return {seed: research results}.
+        """
+        seed_brands = list(dict.fromkeys(seed_brands))
+        for stage in self.stages:
+            stage.start()
+        try:
+            for seed in seed_brands:
+                self._collector.add_seed()
+                self.stages[0].put(seed)
+            self._collector.wait()
+        finally:
+            for stage in self.stages:
+                stage.stop()
+        return {seed: self._collector.seed_results(seed) for seed in seed_brands}
+
+    def stats(self):
+        """
+        Per-stage queue depth and service time.
+        """
+        return {stage.name: stage.stats() for stage in self.stages}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Research a batch of seed brands through the stage pipeline.")
+    parser.add_argument('seeds_file', help="File with one seed brand per line")
+    parser.add_argument('--company-info', required=True, help="Your company information")
+    parser.add_argument('--goal', required=True, help="Outreach goal")
+    parser.add_argument('--cta', required=True, help="Desired call to action")
+    parser.add_argument('--output', help="Write results as JSON to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    with open(args.seeds_file) as f:
+        seeds = [line.strip() for line in f if line.strip()]
+
+    pipeline = ResearchPipeline(args.company_info, args.goal, args.cta)
+    results = pipeline.run(seeds)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+    print(json.dumps(pipeline.stats(), indent=2), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# src/brand_research/ratelimit.py
+#
+# Per-provider request scheduling under the providers' rate limits.
+#
+# Each provider has a token bucket (GCRA: a single "theoretical arrival time"
+# per bucket). A call reserves the next free slot and waits until then, so
+# bursts are queued in order instead of failing with 429s. The bucket also
+# follows what the provider tells us: rate-limit headers on every response
+# (x-ratelimit-remaining-* / x-ratelimit-reset-*) let only the remaining
+# requests through before the quota resets (or pause the bucket until then),
+# and a 429 pauses it for Retry-After.
+#
+#     await ratelimit.acquire('hunter')   # done for you by resilience.call
+#
+# With RATE_LIMIT_REDIS=true the buckets are kept in Redis and shared by all
+# workers; if Redis is unreachable each worker falls back to its own bucket.
+# Limits are per provider; override them with e.g.
+# RATE_LIMITS='{"hunter": {"rate": 4, "burst": 8}}'
+
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+import logging
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+from . import metrics, deadline
+from .runtime import loop_local
+
+# Load environment variables
+load_dotenv()
+
+# rate: sustained requests per second; burst: requests allowed at once
+RATE_LIMITS = {
+    # OpenAI's limits depend on the account tier; its headers tighten this further
+    'openai': {'rate': 50, 'burst': 50},
+    # Hunter allows 15 requests/second and 500/minute
+    'hunter': {'rate': 8, 'burst': 15},
+    'serpapi': {'rate': 5, 'burst': 10},
+}
+for _provider, _overrides in json.loads(os.getenv('RATE_LIMITS', '{}')).items():
+    RATE_LIMITS[_provider] = {**RATE_LIMITS.get(_provider, {}), **_overrides}
+
+RATE_LIMIT_REDIS = os.getenv('RATE_LIMIT_REDIS', 'false').lower() == 'true'
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+# Calls that would have to queue for longer than this fail with RateLimitExceeded
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', 30))
+# Pause after a 429 that has no Retry-After header
+RATE_LIMIT_429_PAUSE = float(os.getenv('RATE_LIMIT_429_PAUSE', 1))
+
+# Which provider's bucket a response from each host updates
+RATE_LIMIT_HOSTS = {
+    'api.openai.com': 'openai',
+    'api.hunter.io': 'hunter',
+    'serpapi.com': 'serpapi',
+}
+
+# (remaining header, reset header, counts requests) pairs; token quotas only pause the bucket
+RATE_LIMIT_HEADERS = (
+    ('x-ratelimit-remaining-requests', 'x-ratelimit-reset-requests', True),
+    ('x-ratelimit-remaining-tokens', 'x-ratelimit-reset-tokens', False),
+    ('x-ratelimit-remaining', 'x-ratelimit-reset', True),
+    ('ratelimit-remaining', 'ratelimit-reset', True),
+)
+
+logger = logging.getLogger(__name__)
+
+# Reserve the next slot unless it is more than max_wait away. KEYS[2] holds
+# the requests left until the provider's quota resets (it expires then); once
+# none are left, the next slot is after the reset.
+# Returns {reserved, wait}; floats are returned as strings.
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), now)
+local left = tonumber(redis.call('GET', KEYS[2]) or '-1')
+if left == 0 then
+    local reset_at = now + math.max(redis.call('PTTL', KEYS[2]), 0) / 1000
+    tat = math.max(tat, reset_at + (burst - 1) * interval)
+end
+local wait = math.max(tat + interval - burst * interval - now, 0)
+if wait > max_wait then
+    return {0, tostring(wait)}
+end
+if left > 0 then
+    redis.call('DECR', KEYS[2])
+end
+redis.call('SET', KEYS[1], tostring(tat + interval), 'PX', math.ceil((tat + interval - now) * 1000) + 1000)
+return {1, tostring(wait)}
+"""
+
+# Push the bucket's arrival time to at least now + ARGV[1] seconds
+_HOLD_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), now + tonumber(ARGV[1]))
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000) + 1000)
+return 1
+"""
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a call would have to wait longer than RATE_LIMIT_MAX_WAIT for its provider.
+    """
+
+
+def _get_redis():
+    return loop_local('ratelimit-redis', lambda: aioredis.Redis.from_url(REDIS_URL))
+
+def parse_reset(value):
+    """
+    Seconds until a rate-limit reset given as '1s', '6m0s', '20ms', plain
+    seconds or a Unix timestamp. Returns None if it can't be parsed.
+    """
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+        if not parts:
+            return None
+        units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+        return sum(float(number) * units[unit] for number, unit in parts)
+    if seconds > 1e9:
+        return max(0.0, seconds - time.time())
+    return seconds
+
+
+class RateLimiter:
+    """
+    Token bucket for one provider, kept locally or in Redis.
+    """
+
+    def __init__(self, provider, rate, burst, distributed=None):
+        self.provider = provider
+        self.interval = 1.0 / rate
+        self.burst = burst
+        self.distributed = RATE_LIMIT_REDIS if distributed is None else distributed
+        self.key = f"hustler:ratelimit:{provider}"
+        self.quota_key = f"{self.key}:quota"
+        self._lock = threading.Lock()
+        self._tat = 0.0
+        # [requests left, monotonic reset time] from the provider's headers
+        self._quota = None
+
+    def _reserve_local(self, max_wait):
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat, now)
+            if self._quota and now >= self._quota[1]:
+                self._quota = None
+            if self._quota and self._quota[0] <= 0:
+                tat = max(tat, self._quota[1] + (self.burst - 1) * self.interval)
+            wait = max(tat + self.interval - self.burst * self.interval - now, 0.0)
+            if wait > max_wait:
+                return False, wait
+            if self._quota and self._quota[0] > 0:
+                self._quota[0] -= 1
+            self._tat = tat + self.interval
+            return True, wait
+
+    def _hold_local(self, seconds):
+        with self._lock:
+            self._tat = max(self._tat, time.monotonic() + seconds)
+
+    async def _reserve(self, max_wait):
+        if self.distributed:
+            try:
+                reserved, wait = await _get_redis().eval(
+                    _RESERVE_SCRIPT, 2, self.key, self.quota_key, self.interval, self.burst, max_wait
+                )
+                return bool(reserved), float(wait)
+            except Exception as e:
+                logger.warning(f"Rate limiter Redis reserve failed for {self.provider}, using local bucket: {str(e)}")
+        return self._reserve_local(max_wait)
+
+    async def _hold(self, seconds):
+        self._hold_local(seconds)
+        if self.distributed:
+            try:
+                await _get_redis().eval(_HOLD_SCRIPT, 1, self.key, seconds)
+            except Exception as e:
+                logger.warning(f"Rate limiter Redis update failed for {self.provider}: {str(e)}")
+
+    async def _limit(self, remaining, seconds):
+        with self._lock:
+            self._quota = [remaining, time.monotonic() + seconds]
+        if self.distributed:
+            try:
+                await _get_redis().set(self.quota_key, remaining, px=max(int(seconds * 1000), 1))
+            except Exception as e:
+                logger.warning(f"Rate limiter Redis update failed for {self.provider}: {str(e)}")
+
+    async def acquire(self):
+        """
+        Wait for the next free slot. Raises DeadlineExceeded if the slot is
+        after the current deadline, or RateLimitExceeded if it is more than
+        RATE_LIMIT_MAX_WAIT away.
+        """
+        left = deadline.remaining()
+        max_wait = RATE_LIMIT_MAX_WAIT if left is None else min(RATE_LIMIT_MAX_WAIT, left)
+        reserved, wait = await self._reserve(max_wait)
+        if not reserved:
+            metrics.increment(f"ratelimit.{self.provider}.rejected")
+            if left is not None and wait > left:
+                raise deadline.DeadlineExceeded(f"Deadline exceeded waiting for {self.provider} rate limit")
+            raise RateLimitExceeded(f"{self.provider} rate limit: next slot in {wait:.1f}s")
+        metrics.observe(f"ratelimit.{self.provider}.wait", wait)
+        if wait > 0:
+            metrics.increment(f"ratelimit.{self.provider}.throttled")
+            await asyncio.sleep(wait)
+
+    async def pause(self, seconds):
+        """
+        Let no call through for `seconds`.
+        """
+        metrics.increment(f"ratelimit.{self.provider}.paused")
+        logger.info(f"Pausing {self.provider} calls for {seconds:.2f}s")
+        await self._hold(seconds + (self.burst - 1) * self.interval)
+
+    async def observe(self, status_code, headers):
+        """
+        Adjust the bucket to a response's status and rate-limit headers.
+        """
+        if status_code == 429:
+            retry_after = parse_reset(headers.get('retry-after'))
+            await self.pause(retry_after if retry_after is not None else RATE_LIMIT_429_PAUSE)
+            return
+        for remaining_header, reset_header, counts_requests in RATE_LIMIT_HEADERS:
+            try:
+                remaining = float(headers[remaining_header])
+            except (KeyError, ValueError):
+                continue
+            if remaining <= 0:
+                reset = parse_reset(headers.get(reset_header))
+                await self.pause(reset if reset is not None else RATE_LIMIT_429_PAUSE)
+                return
+            if counts_requests and remaining < self.burst:
+                # Only `remaining` requests may go out before the window resets
+                reset = parse_reset(headers.get(reset_header))
+                if reset is not None:
+                    await self._limit(int(remaining), reset)
+                else:
+                    await self._hold((self.burst - remaining) * self.interval)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(provider):
+    """
+    Return the shared RateLimiter for `provider`, or None if it has no limits.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            limits = RATE_LIMITS.get(provider)
+            _limiters[provider] = RateLimiter(provider, limits['rate'], limits['burst']) if limits else None
+        return _limiters[provider]
+
+async def acquire(provider):
+    """
+    Wait until a call to `provider` is allowed (see RateLimiter.acquire).
+    """
+    limiter = get_limiter(provider)
+    if limiter is not None:
+        await limiter.acquire()
+
+async def observe_response(response):
+    """
+    httpx response hook: update the bucket of the provider that sent `response`.
+    """
+    limiter = get_limiter(RATE_LIMIT_HOSTS.get(response.url.host))
+    if limiter is None:
+        return
+    try:
+        await limiter.observe(response.status_code, response.headers)
+    except Exception as e:
+        logger.warning(f"Could not apply {limiter.provider} rate-limit headers: {str(e)}")
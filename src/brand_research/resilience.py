@@ -0,0 +1,215 @@
+# src/brand_research/resilience.py
+#
+# Resilient calls to external providers (OpenAI, Hunter, SerpAPI):
+#
+#   - every attempt has a timeout
+#   - rate limits (429), server errors (5xx) and connection errors are
+#     retried with jittered exponential backoff, honouring Retry-After
+#   - optionally, an attempt still running after the provider's p95 latency
+#     gets a hedged duplicate, and whichever answers first wins
+#   - timeouts and backoff never run past the current request deadline
+#   - every attempt first waits for the provider's rate limiter (ratelimit.py)
+#   - calls to a provider whose circuit breaker is open fail right away (circuit.py)
+#
+#     response = await resilience.call('hunter', lambda: http.get(url, params=params))
+#
+# Policies are per provider; override them with e.g.
+# RESILIENCE_POLICIES='{"serpapi": {"hedge": true}, "openai": {"retries": 4}}'
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+import httpx
+import openai
+from dotenv import load_dotenv
+from . import metrics, deadline, ratelimit, circuit
+
+# Load environment variables
+load_dotenv()
+
+# timeout: seconds per attempt; retries: extra attempts after the first;
+# backoff_base/backoff_max: seconds; hedge: send hedged duplicates after p95.
+# Hedging is off by default because every provider bills per request.
+RESILIENCE_POLICIES = {
+    'openai': {'timeout': 60, 'retries': 2, 'backoff_base': 0.5, 'backoff_max': 8, 'hedge': False},
+    'hunter': {'timeout': 10, 'retries': 3, 'backoff_base': 0.25, 'backoff_max': 4, 'hedge': False},
+    'serpapi': {'timeout': 10, 'retries': 3, 'backoff_base': 0.25, 'backoff_max': 4, 'hedge': False},
+    # Company websites fetched by the contact crawler
+    'crawler': {'timeout': 8, 'retries': 1, 'backoff_base': 0.25, 'backoff_max': 2, 'hedge': False},
+}
+DEFAULT_POLICY = {'timeout': 30, 'retries': 2, 'backoff_base': 0.25, 'backoff_max': 4, 'hedge': False}
+for _provider, _overrides in json.loads(os.getenv('RESILIENCE_POLICIES', '{}')).items():
+    RESILIENCE_POLICIES[_provider] = {**RESILIENCE_POLICIES.get(_provider, DEFAULT_POLICY), **_overrides}
+
+# Hedge only once this many latencies have been seen, using the last HEDGE_WINDOW
+HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 20))
+HEDGE_WINDOW = 200
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+_latencies = {}
+_latencies_lock = threading.Lock()
+
+
+def get_policy(provider):
+    return RESILIENCE_POLICIES.get(provider, DEFAULT_POLICY)
+
+def _status_code(exc):
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code
+    return None
+
+def is_retryable(exc):
+    """
+    True for errors worth retrying: 429, 5xx and connection failures.
+    Timeouts are not retried, the attempt already used its whole budget.
+    """
+    if isinstance(exc, (httpx.TimeoutException, openai.APITimeoutError)):
+        return False
+    if isinstance(exc, (httpx.TransportError, openai.APIConnectionError)):
+        return True
+    return _status_code(exc) in RETRYABLE_STATUS_CODES
+
+def is_provider_failure(exc):
+    """
+    True for errors that suggest the provider itself is unhealthy: 5xx and
+    connection failures. Client errors and rate limits are not its fault.
+    """
+    return is_retryable(exc) and _status_code(exc) != 429
+
+def _retry_after(exc):
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, policy, exc=None):
+    """
+    Full-jitter exponential backoff, or the server's Retry-After if it gave one.
+    """
+    retry_after = _retry_after(exc) if exc is not None else None
+    if retry_after is not None:
+        return min(retry_after, policy['backoff_max'])
+    return random.uniform(0, min(policy['backoff_max'], policy['backoff_base'] * 2 ** attempt))
+
+def _record_latency(name, seconds):
+    with _latencies_lock:
+        samples = _latencies.get(name)
+        if samples is None:
+            samples = _latencies[name] = deque(maxlen=HEDGE_WINDOW)
+        samples.append(seconds)
+
+def p95_latency(name):
+    """
+    p95 of recent successful attempt latencies for `name`, or None if too few.
+    """
+    with _latencies_lock:
+        samples = sorted(_latencies.get(name, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return samples[int(0.95 * (len(samples) - 1))]
+
+async def _hedged(provider, name, fn, hedge_after):
+    # Start a duplicate if the first attempt is slower than p95; first answer wins
+    first = asyncio.ensure_future(fn())
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+
+    async def duplicate():
+        # The duplicate is a request like any other
+        await ratelimit.acquire(provider)
+        return await fn()
+
+    metrics.increment(f"resilience.{name}.hedges")
+    second = asyncio.ensure_future(duplicate())
+    pending = {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        metrics.increment(f"resilience.{name}.hedge_wins")
+                    return task.result()
+        # Both failed: report the original attempt's error
+        return first.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def call(provider, fn, operation=None, timeout=None):
+    """
+    Return `await fn()` under the provider's policy. `fn` must start a new
+    request each time it is called; it should raise for error responses
+    (e.g. httpx's response.raise_for_status()).
+
+    `operation` (e.g. the LLM stage) keeps separate latency stats for calls
+    that are much slower than others to the same provider. `timeout`
+    overrides the policy's per-attempt timeout. Either is capped to the
+    current deadline, and DeadlineExceeded is raised when it runs out.
+    Time spent queued by the rate limiter does not count against the
+    attempt's timeout, only against the deadline. CircuitOpenError is
+    raised right away while the provider's circuit is open.
+    """
+    policy = get_policy(provider)
+    name = f"{provider}.{operation}" if operation else provider
+    breaker = circuit.get_breaker(provider)
+
+    for attempt in range(policy['retries'] + 1):
+        if breaker is not None:
+            breaker.before_call()
+        await ratelimit.acquire(provider)
+        attempt_timeout = deadline.cap_timeout(timeout or policy['timeout'], provider)
+        started = time.monotonic()
+        try:
+            hedge_after = p95_latency(name) if policy['hedge'] else None
+            if hedge_after is not None and hedge_after < attempt_timeout:
+                result = await asyncio.wait_for(_hedged(provider, name, fn, hedge_after), attempt_timeout)
+            else:
+                result = await asyncio.wait_for(fn(), attempt_timeout)
+        except asyncio.TimeoutError:
+            metrics.increment(f"resilience.{name}.timeouts")
+            if not deadline.has_budget(0.001):
+                # Cut short by our deadline, which says nothing about the provider
+                raise deadline.DeadlineExceeded(f"Deadline exceeded during {name} call")
+            if breaker is not None:
+                breaker.record(failed=True)
+            raise
+        except Exception as e:
+            if breaker is not None:
+                breaker.record(failed=is_provider_failure(e))
+            if attempt == policy['retries'] or not is_retryable(e):
+                metrics.increment(f"resilience.{name}.failures")
+                raise
+            if _status_code(e) == 429 and ratelimit.get_limiter(provider) is not None:
+                # The rate limiter has paused the provider; the retry queues there
+                delay = 0
+            else:
+                delay = backoff_delay(attempt, policy, e)
+            if not deadline.has_budget(delay):
+                # No time left to wait and try again
+                metrics.increment(f"resilience.{name}.failures")
+                raise
+            metrics.increment(f"resilience.{name}.retries")
+            logger.warning(f"{name} call failed ({str(e)}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+        elapsed = time.monotonic() - started
+        if breaker is not None:
+            breaker.record(failed=False, latency=elapsed)
+        _record_latency(name, elapsed)
+        metrics.observe(f"resilience.{name}.latency", elapsed)
+        return result
@@ -0,0 +1,97 @@
+# src/brand_research/runtime.py
+
+import queue
+import asyncio
+import threading
+import weakref
+
+# Shared event loop used by the synchronous wrappers
+_loop = None
+_loop_lock = threading.Lock()
+
+# Per-event-loop singletons (async clients hold connections bound to their loop)
+_loop_locals = weakref.WeakKeyDictionary()
+_loop_locals_lock = threading.Lock()
+
+
+def get_background_loop():
+    """
+    Return the shared background event loop, starting its thread on first use.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='research-event-loop', daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def run_sync(coro):
+    """
+    Run a coroutine on the shared background event loop and block until it finishes.
+    Lets synchronous callers (Flask views, scripts, thread pools) reuse the async code.
+    """
+    loop = get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the background event loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def iter_sync(agen):
+    """
+    Drive an async generator on the shared background event loop and yield
+    its items to a synchronous caller as they arrive.
+
+    The generator runs in a single task, so context variables it sets (such
+    as the research deadline) stay in effect between items. Closing this
+    generator early cancels that task.
+    """
+    loop = get_background_loop()
+    items = queue.Queue()
+    finished = object()
+
+    async def pump():
+        error = None
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except BaseException as e:
+            # Including CancelledError: the consumer must always wake up
+            error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            items.put((finished, error))
+            await agen.aclose()
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    try:
+        while True:
+            item, error = items.get()
+            if item is finished:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        future.cancel()
+
+
+def loop_local(key, factory):
+    """
+    Return the value stored under `key` for the running event loop, creating it
+    with factory() on first use.
+    """
+    loop = asyncio.get_running_loop()
+    with _loop_locals_lock:
+        values = _loop_locals.setdefault(loop, {})
+        if key not in values:
+            values[key] = factory()
+        return values[key]
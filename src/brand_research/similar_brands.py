@@ -1,61 +1,134 @@
 # src/brand_research/similar_brands.py
 
-import requests
-from bs4 import BeautifulSoup
-import re
+import asyncio
+import logging
 from dotenv import load_dotenv
 import os
+from .runtime import run_sync
+from .cache import ProviderCache, get_cache_backend
+from .singleflight import SingleFlight
+from .canonical import get_brand_index
+from . import resilience, circuit
+from .http_client import get_async_client
+from .crawler import crawl_emails
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Get API key from environment variable
 SERPAPI_KEY = os.getenv('SERPAPI_KEY')
+SERPAPI_URL = "https://serpapi.com/search.json"
+SERPAPI_ACCOUNT_URL = "https://serpapi.com/account.json"
 
-def search_similar_brands(brand_name):
+# SerpAPI answers are cached per normalised query. Entries older than
+# SERPAPI_CACHE_TTL are still served for SERPAPI_STALE_TTL more seconds while
+# a background refresh runs (set it to 0 to disable stale-while-revalidate).
+SERPAPI_CACHE_BACKEND = os.getenv('SERPAPI_CACHE_BACKEND', 'sqlite')
+SERPAPI_CACHE_TTL = int(os.getenv('SERPAPI_CACHE_TTL', 7 * 24 * 3600))
+SERPAPI_STALE_TTL = int(os.getenv('SERPAPI_STALE_TTL', 30 * 24 * 3600))
+
+logger = logging.getLogger(__name__)
+
+_serpapi_cache = None
+_serpapi_flight = SingleFlight('serpapi')
+
+def get_serpapi_cache():
+    global _serpapi_cache
+    if _serpapi_cache is None:
+        _serpapi_cache = ProviderCache('serpapi:search', get_cache_backend(SERPAPI_CACHE_BACKEND), ttl=SERPAPI_CACHE_TTL)
+    return _serpapi_cache
+
+def normalize_query(query):
+    """
+    Normalise a search query so equivalent queries share a cache entry.
+    """
+    return ' '.join(query.lower().split())
+
+async def serpapi_search_async(query):
+    """
+    Run a SerpAPI Google search and return its organic results as a list of
+    {'title', 'link'} dicts, served from the cache when possible.
+    """
+    query = normalize_query(query)
+
+    async def fetch():
+        async def request():
+            response = await get_async_client().get(SERPAPI_URL, params={'q': query, 'api_key': SERPAPI_KEY})
+            response.raise_for_status()
+            return response
+
+        data = (await resilience.call('serpapi', request)).json()
+        return [{'title': result.get('title'), 'link': result.get('link')} for result in data.get('organic_results', [])]
+
+    return await _serpapi_flight.do(
+        query,
+        lambda: get_serpapi_cache().get_or_fetch_async(query, fetch, stale_ttl=SERPAPI_STALE_TTL)
+    )
+
+async def _health_probe():
+    # The account endpoint doesn't count against the search quota
+    response = await get_async_client().get(SERPAPI_ACCOUNT_URL, params={'api_key': SERPAPI_KEY})
+    response.raise_for_status()
+
+circuit.register_probe('serpapi', _health_probe)
+
+async def search_similar_brands_async(brand_name):
     """
     Search for brands similar to the given brand name.
     """
     # Use SerpAPI to search for similar brands
-    url = f"https://serpapi.com/search.json?q=brands+similar+to+{brand_name}&api_key={SERPAPI_KEY}"
-    response = requests.get(url)
-    data = response.json()
+    brand_name = get_brand_index().display_name(brand_name)
+    organic_results = await serpapi_search_async(f"brands similar to {brand_name}")
     
     # Extract organic results
-    similar_brands = [result['title'] for result in data.get('organic_results', [])[:5]]
+    similar_brands = [result['title'] for result in organic_results[:5]]
     return similar_brands
 
-def find_company_website(brand_name):
+def search_similar_brands(brand_name):
+    """
+    Synchronous wrapper around search_similar_brands_async.
+    """
+    return run_sync(search_similar_brands_async(brand_name))
+
+async def find_company_website_async(brand_name):
     """
     Find the official website for a given brand name.
     """
     # Use SerpAPI to search for the brand's website
-    url = f"https://serpapi.com/search.json?q={brand_name}+official+website&api_key={SERPAPI_KEY}"
-    response = requests.get(url)
-    data = response.json()
+    index = get_brand_index()
+    organic_results = await serpapi_search_async(f"{index.display_name(brand_name)} official website")
     
     # Extract the first organic result as the official website
-    if data.get('organic_results'):
-        return data['organic_results'][0]['link']
+    if organic_results:
+        website = organic_results[0]['link']
+        # Remember the website so other names for this brand resolve to it
+        await asyncio.to_thread(index.observe, brand_name, website)
+        return website
     return None
 
-def scrape_emails(url):
+def find_company_website(brand_name):
     """
-    Scrape email addresses from a given URL.
+    Synchronous wrapper around find_company_website_async.
+    """
+    return run_sync(find_company_website_async(brand_name))
+
+async def scrape_emails_async(url):
+    """
+    Find the email addresses on a company's website: its homepage and likely
+    contact pages, crawled concurrently (see crawler.py).
     """
     try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find all email addresses on the page
-        email_regex = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_regex, soup.text)
-        
-        return emails
+        return await crawl_emails(url)
     except Exception as e:
-        print(f"Error scraping {url}: {str(e)}")
+        logger.error(f"Error scraping {url}: {str(e)}")
         return []
 
+def scrape_emails(url):
+    """
+    Synchronous wrapper around scrape_emails_async.
+    """
+    return run_sync(scrape_emails_async(url))
+
 def categorize_emails(emails):
     """
     Attempt to categorize emails based on common patterns.
@@ -0,0 +1,272 @@
+# src/brand_research/similar_index.py
+#
+# Local "similar to X" index built from accumulated research results.
+#
+# Every similar-brand list the LLM gives us links the seed brand to each
+# brand in the list (and the listed brands to each other, more weakly). A
+# brand's vector is its own id plus the brands it is linked to, weighted by
+# how often we have seen each link, plus the words of its description. Brands
+# that are linked to the same brands end up close together, so the nearest
+# neighbours of a well-researched brand are its similar brands and
+# the LLM is only needed for brands the index does not know well enough.
+# A neighbour is only returned once the seed's link to it has been seen
+# SIMILAR_INDEX_MIN_LINK_WEIGHT times, with the reason from the seed's own
+# research, so one LLM answer is never replayed as if it were confirmed.
+# Each listing is counted once per distinct reason: an answer replayed from
+# the LLM cache or shared by a single-flight adds nothing.
+#
+# Links are stored in the brand index's SQLite file so every worker shares
+# them; vectors are hashed (no fitted vocabulary) so new research is added
+# incrementally without retraining.
+
+import os
+import re
+import hashlib
+import time
+import math
+import sqlite3
+import threading
+import logging
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import normalize
+from dotenv import load_dotenv
+from . import metrics
+from .canonical import BRAND_INDEX_PATH, get_brand_index
+
+# Load environment variables
+load_dotenv()
+
+SIMILAR_INDEX_ENABLED = os.getenv('SIMILAR_INDEX_ENABLED', 'true').lower() == 'true'
+# Minimum cosine similarity for a neighbour to count as a confident answer
+SIMILAR_INDEX_MIN_SCORE = float(os.getenv('SIMILAR_INDEX_MIN_SCORE', 0.3))
+# Minimum weight of the seed's link to a neighbour (1 per LLM answer listing
+# the pair) before the index answers for the seed
+SIMILAR_INDEX_MIN_LINK_WEIGHT = float(os.getenv('SIMILAR_INDEX_MIN_LINK_WEIGHT', 2))
+# How often (seconds) a worker reloads links added by other workers
+SIMILAR_INDEX_RELOAD_INTERVAL = int(os.getenv('SIMILAR_INDEX_RELOAD_INTERVAL', 60))
+SIMILAR_INDEX_FEATURES = 2 ** 18
+
+# Link weights: seed <-> listed brand, and listed brand <-> listed brand
+SEED_LINK_WEIGHT = 1.0
+CO_LISTED_LINK_WEIGHT = 0.5
+# Total weight of a brand's description words relative to one link
+DESCRIPTION_WEIGHT = 0.5
+
+logger = logging.getLogger(__name__)
+
+
+class SimilarBrandIndex:
+    """
+    Nearest-neighbour index over brand vectors, with incremental insertion
+    through add_research().
+    """
+
+    def __init__(self, path=BRAND_INDEX_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._links = {}
+        self._hasher = FeatureHasher(n_features=SIMILAR_INDEX_FEATURES, input_type='dict')
+        self._ids = []
+        self._neighbors = None
+        # Bumped on every change; the vectors are rebuilt when they are older
+        self._version = 0
+        self._built_version = -1
+        self._loaded_at = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS brand_links ("
+                "brand_id TEXT NOT NULL, other_id TEXT NOT NULL, weight REAL NOT NULL, reason TEXT, "
+                "updated_at REAL NOT NULL, PRIMARY KEY (brand_id, other_id))"
+            )
+            # Listings already counted, so replayed answers don't add weight
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS brand_link_answers ("
+                "brand_id TEXT NOT NULL, other_id TEXT NOT NULL, answer_hash TEXT NOT NULL, "
+                "PRIMARY KEY (brand_id, other_id, answer_hash))"
+            )
+        self._reload()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _reload(self):
+        links = {}
+        for brand_id, other_id, weight, reason in self._connection().execute(
+            "SELECT brand_id, other_id, weight, reason FROM brand_links"
+        ):
+            links.setdefault(brand_id, {})[other_id] = {'weight': weight, 'reason': reason}
+        with self._lock:
+            self._links = links
+            self._version += 1
+            self._loaded_at = time.monotonic()
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._loaded_at > SIMILAR_INDEX_RELOAD_INTERVAL:
+            try:
+                self._reload()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not reload similar-brand index: {str(e)}")
+
+    def add_research(self, brand_name, similar_brands):
+        """
+        Add the similar brands the LLM gave for `brand_name` to the index.
+        Brands already recorded for `brand_name` with the same reason (the
+        same answer seen again) are skipped.
+        """
+        index = get_brand_index()
+        seed = index.resolve(brand_name)
+        listed = {}
+        for brand in similar_brands:
+            other = index.resolve(brand['company'])
+            if other != seed:
+                listed.setdefault(other, brand.get('reason'))
+
+        new = {}
+        with self._connection() as conn:
+            for other, reason in listed.items():
+                answer_hash = hashlib.sha256(' '.join(str(reason or '').lower().split()).encode('utf-8')).hexdigest()
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO brand_link_answers (brand_id, other_id, answer_hash) VALUES (?, ?, ?)",
+                    (seed, other, answer_hash)
+                ).rowcount
+                if inserted:
+                    new[other] = reason
+
+        updates = []
+        for other, reason in new.items():
+            updates.append((seed, other, SEED_LINK_WEIGHT, reason))
+            updates.append((other, seed, SEED_LINK_WEIGHT, None))
+            for peer in listed:
+                if peer != other:
+                    updates.append((other, peer, CO_LISTED_LINK_WEIGHT, None))
+        if not updates:
+            return
+
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO brand_links (brand_id, other_id, weight, reason, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (brand_id, other_id) DO UPDATE SET weight = weight + excluded.weight, "
+                "reason = COALESCE(excluded.reason, reason), updated_at = excluded.updated_at",
+                [update + (now,) for update in updates]
+            )
+        with self._lock:
+            for brand_id, other_id, weight, reason in updates:
+                link = self._links.setdefault(brand_id, {}).setdefault(other_id, {'weight': 0.0, 'reason': None})
+                link['weight'] += weight
+                link['reason'] = reason or link['reason']
+            self._version += 1
+
+    def _features(self, brand_id, links):
+        features = {f"brand:{brand_id}": 1.0}
+        for other_id, link in links.items():
+            features[f"brand:{other_id}"] = math.sqrt(link['weight'])
+        description = get_brand_index().get_description(brand_id)
+        words = set(re.findall(r'[a-z]{3,}', description.lower())) if description else set()
+        for word in words:
+            features[f"word:{word}"] = DESCRIPTION_WEIGHT / math.sqrt(len(words))
+        return features
+
+    def _build(self):
+        # Brute-force cosine search only stores the matrix, so rebuilding after
+        # an insert costs one pass over the (sparse) vectors
+        with self._lock:
+            if self._built_version == self._version:
+                return self._ids, self._neighbors
+            version = self._version
+            links = {brand_id: dict(others) for brand_id, others in self._links.items()}
+        ids = list(links)
+        neighbors = None
+        if ids:
+            matrix = normalize(self._hasher.transform(self._features(brand_id, links[brand_id]) for brand_id in ids))
+            neighbors = NearestNeighbors(metric='cosine', algorithm='brute').fit(matrix)
+        with self._lock:
+            self._ids, self._neighbors = ids, neighbors
+            self._built_version = version
+        return ids, neighbors
+
+    def similar(self, brand_name, k):
+        """
+        Return up to `k` similar brands as [{'company', 'domain', 'reason', 'score'}]
+        with a cosine similarity of at least SIMILAR_INDEX_MIN_SCORE, most similar first.
+        Only brands the seed's own research listed, with a link weight of at
+        least SIMILAR_INDEX_MIN_LINK_WEIGHT, are returned, so this is [] for
+        brands the index does not know well enough.
+        """
+        self._maybe_reload()
+        index = get_brand_index()
+        seed = index.resolve(brand_name)
+        with self._lock:
+            links = dict(self._links.get(seed, {}))
+        confirmed = {other for other, link in links.items()
+                     if link['reason'] and link['weight'] >= SIMILAR_INDEX_MIN_LINK_WEIGHT}
+        if not confirmed:
+            return []
+
+        ids, neighbors = self._build()
+        query = normalize(self._hasher.transform([self._features(seed, links)]))
+        distances, positions = neighbors.kneighbors(query, n_neighbors=min(len(ids), 3 * k + 1))
+
+        results = []
+        for distance, position in zip(distances[0], positions[0]):
+            other = ids[position]
+            score = 1.0 - distance
+            if other not in confirmed or score < SIMILAR_INDEX_MIN_SCORE:
+                continue
+            results.append({
+                'company': index.display_name(other),
+                'domain': index.get_domain(other),
+                'reason': links[other]['reason'],
+                'score': round(float(score), 3),
+            })
+            if len(results) == k:
+                break
+        return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_similar_index():
+    """
+    Return the shared SimilarBrandIndex.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SimilarBrandIndex()
+        return _index
+
+def find_similar_brands(brand_name, k):
+    """
+    Return `k` similar brands from the local index, or None if it does not
+    know `brand_name` well enough (the caller should ask the LLM).
+    """
+    if not SIMILAR_INDEX_ENABLED:
+        return None
+    started = time.monotonic()
+    try:
+        similar_brands = get_similar_index().similar(brand_name, k)
+    except Exception as e:
+        logger.warning(f"Similar-brand index lookup failed for {brand_name}: {str(e)}")
+        return None
+    metrics.observe('similar_index.lookup_time', time.monotonic() - started)
+    if len(similar_brands) < k:
+        metrics.increment('similar_index.misses')
+        return None
+    metrics.increment('similar_index.hits')
+    return similar_brands
+
+def record_similar_brands(brand_name, similar_brands):
+    """
+    Add an LLM answer to the local index.
+    """
+    if SIMILAR_INDEX_ENABLED:
+        get_similar_index().add_research(brand_name, similar_brands)
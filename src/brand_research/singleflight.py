@@ -0,0 +1,178 @@
+# src/brand_research/singleflight.py
+#
+# Single-flight coalescing of identical concurrent calls. While one caller
+# (the leader) computes the result for a key, every other caller with the
+# same key waits for and shares that result instead of repeating the work.
+#
+# Works across threads and event loops within a worker process. With
+# SINGLEFLIGHT_REDIS=true it also coalesces across workers: the leader holds
+# a Redis lock and publishes its (JSON-serialisable) result for the others.
+
+import os
+import copy
+import json
+import time
+import uuid
+import asyncio
+import threading
+import logging
+import concurrent.futures
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+from . import metrics
+from .runtime import loop_local
+from .deadline import DeadlineExceeded, wait_for
+
+# Load environment variables
+load_dotenv()
+
+SINGLEFLIGHT_REDIS = os.getenv('SINGLEFLIGHT_REDIS', 'false').lower() == 'true'
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+# How long a leader may hold the cross-worker lock, and how long its result is kept for followers
+SINGLEFLIGHT_LOCK_TIMEOUT = float(os.getenv('SINGLEFLIGHT_LOCK_TIMEOUT', 120))
+SINGLEFLIGHT_RESULT_TTL = float(os.getenv('SINGLEFLIGHT_RESULT_TTL', 30))
+SINGLEFLIGHT_POLL_INTERVAL = 0.1
+
+logger = logging.getLogger(__name__)
+
+# Published to followers when the leader's call was cancelled or ran out of
+# the leader's deadline: they retry instead of failing with the leader's error
+_RETRY = object()
+
+# Delete the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _get_redis():
+    return loop_local('singleflight-redis', lambda: aioredis.Redis.from_url(REDIS_URL))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+        flight = SingleFlight('hunter')
+        emails = await flight.do(domain, lambda: lookup(domain))
+
+    Followers receive a deep copy of the leader's result, so callers may
+    mutate what they get back. If the leader's call is cancelled or runs out
+    of the leader's deadline, followers run the call again themselves. Every
+    caller waits only until its own deadline (DeadlineExceeded), however long
+    the shared call takes.
+    """
+
+    def __init__(self, name, distributed=None):
+        self.name = name
+        self.distributed = SINGLEFLIGHT_REDIS if distributed is None else distributed
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    async def do(self, key, fn):
+        """
+        Return `await fn()`, sharing one in-flight call per key.
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = concurrent.futures.Future()
+                    self._calls[key] = future
+            if leader:
+                break
+            metrics.increment(f"singleflight.{self.name}.shared")
+            # Shielded so a follower being cancelled or running out of its own
+            # deadline doesn't cancel the shared call
+            result = await wait_for(asyncio.shield(asyncio.wrap_future(future)), self.name)
+            if result is not _RETRY:
+                return copy.deepcopy(result)
+            metrics.increment(f"singleflight.{self.name}.retried")
+
+        metrics.increment(f"singleflight.{self.name}.leader")
+        # The call runs in its own task, which the leader only awaits through a
+        # shield: the leader's request being cancelled (e.g. by its deadline)
+        # must not cancel the call the followers are waiting for
+        task = asyncio.ensure_future(self._lead(key, fn, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(task)
+
+    async def _lead(self, key, fn, future):
+        try:
+            if self.distributed:
+                result = await self._do_distributed(key, fn)
+            else:
+                result = await fn()
+        except (asyncio.CancelledError, DeadlineExceeded):
+            # Specific to the leader's request; followers run the call again
+            self._finish(key, future, _RETRY)
+            raise
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def _finish(self, key, future, result=None, error=None):
+        # Remove the call before publishing its outcome, so followers that
+        # retry start a new call instead of finding this one again
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    async def _do_distributed(self, key, fn):
+        lock_key = f"hustler:singleflight:{self.name}:{key}:lock"
+        result_key = f"hustler:singleflight:{self.name}:{key}:result"
+        token = uuid.uuid4().hex
+        try:
+            r = _get_redis()
+            acquired = await r.set(lock_key, token, nx=True, px=int(SINGLEFLIGHT_LOCK_TIMEOUT * 1000))
+        except Exception as e:
+            logger.warning(f"Single-flight Redis lock failed for {self.name}, running locally: {str(e)}")
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+                await r.set(result_key, json.dumps(result), px=int(SINGLEFLIGHT_RESULT_TTL * 1000))
+                return result
+            finally:
+                try:
+                    await r.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    logger.warning(f"Single-flight Redis unlock failed for {self.name}: {str(e)}")
+
+        # Another worker is computing it: wait for its result while it holds the lock
+        metrics.increment(f"singleflight.{self.name}.shared_remote")
+
+        async def poll():
+            wait_until = time.monotonic() + SINGLEFLIGHT_LOCK_TIMEOUT
+            while time.monotonic() < wait_until:
+                raw = await r.get(result_key)
+                if raw is not None:
+                    return raw
+                if not await r.exists(lock_key):
+                    break
+                await asyncio.sleep(SINGLEFLIGHT_POLL_INTERVAL)
+            return await r.get(result_key)
+
+        try:
+            raw = await wait_for(poll(), self.name)
+            if raw is not None:
+                return json.loads(raw)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Single-flight Redis wait failed for {self.name}: {str(e)}")
+        # The leader failed or timed out without publishing a result
+        return await fn()
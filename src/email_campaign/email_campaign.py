@@ -1,14 +1,10 @@
 # src/email_campaign/email_campaign.py
-import openai
 from dotenv import load_dotenv
-import os
+from ..brand_research.llm import chat_completion
 
 # Load environment variables
 load_dotenv()
 
-# Set up OpenAI API key
-openai.api_key = os.getenv('OPENAI_API_KEY')
-
 def generate_email(sender_info, recipient_info):
     """
     Use OpenAI to generate a tailored email
@@ -25,12 +21,7 @@ def generate_email(sender_info, recipient_info):
     The email should be concise, friendly, and tailored to the recipient company.
     """
     
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a professional email writer, crafting personalized outreach emails for business collaborations."},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    
-    return response.choices[0].message['content'].strip()
\ No newline at end of file
+    return chat_completion('drafting', [
+        {"role": "system", "content": "You are a professional email writer, crafting personalized outreach emails for business collaborations."},
+        {"role": "user", "content": prompt}
+    ])
\ No newline at end of file
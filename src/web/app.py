@@ -1,6 +1,6 @@
 # src/web/app.py
 
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, stream_template, request, redirect, url_for, flash, jsonify, abort
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from dotenv import load_dotenv
@@ -8,7 +8,9 @@ import os
 import logging
 from logging.handlers import RotatingFileHandler
 from ..models import db
-from ..brand_research.brand_research import research_brand
+from ..brand_research.brand_research import research_brand, iter_research_brand
+from ..brand_research.jobs import get_job_backend, RESEARCH_JOB_BACKEND, DONE, FAILED
+from ..brand_research import metrics, circuit
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +28,16 @@ app = Flask(__name__, template_folder=templates_dir)
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY')
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///hustler_ai.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# How /research runs the pipeline:
+#   'queue'  - enqueue a background job and poll for its result
+#   'stream' - stream brand cards to the browser as each brand finishes
+#   'sync'   - run everything in the request and render when done
+# Queueing is the default only with Celery: in-process jobs are only known to
+# the worker that ran them, so with several workers polls would 404.
+app.config['RESEARCH_MODE'] = os.getenv('RESEARCH_MODE', 'queue' if RESEARCH_JOB_BACKEND == 'celery' else 'sync')
+# Overall time budget (seconds) for one research run; stages that don't fit
+# are skipped and the results are marked incomplete
+app.config['RESEARCH_DEADLINE'] = float(os.getenv('RESEARCH_DEADLINE', 25))
 
 
 # Initialize extensions
@@ -49,6 +61,8 @@ if not app.debug:
     app.logger.addHandler(file_handler)
     app.logger.setLevel(logging.INFO)
     app.logger.info('Hustler AI startup')
+    if app.config['RESEARCH_MODE'] == 'queue' and RESEARCH_JOB_BACKEND == 'inprocess':
+        app.logger.warning('Queued research uses in-process jobs: run a single worker or set RESEARCH_JOB_BACKEND=celery')
 
 def create_tables():
     with app.app_context():
@@ -66,9 +80,20 @@ def do_research():
     user_company_info = request.form['user_company_info']
     outreach_goal = request.form['outreach_goal']
     desired_cta = request.form['desired_cta']
+    deadline = app.config['RESEARCH_DEADLINE']
     app.logger.info(f"Researching brand: {brand_name}")
+    if app.config['RESEARCH_MODE'] == 'queue':
+        job_id = get_job_backend().submit(brand_name, user_company_info, outreach_goal, desired_cta, deadline)
+        app.logger.info(f"Research job queued: {job_id}")
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(job_id=job_id, status_url=url_for('research_job_status', job_id=job_id)), 202
+        return redirect(url_for('research_job', job_id=job_id))
+    if app.config['RESEARCH_MODE'] == 'stream':
+        events = stream_research_events(brand_name, user_company_info, outreach_goal, desired_cta, deadline)
+        return app.response_class(stream_template('results_stream.html', events=events, brand_name=brand_name),
+                                  headers={'X-Accel-Buffering': 'no'})
     try:
-        results = research_brand(brand_name, user_company_info, outreach_goal, desired_cta)
+        results = research_brand(brand_name, user_company_info, outreach_goal, desired_cta, deadline=deadline)
         app.logger.info("Research completed successfully")
         return render_template('results.html', results=results, brand_name=brand_name)
     except Exception as e:
@@ -76,6 +101,51 @@ def do_research():
         error_message = f"An error occurred during research: {str(e)}. Please try again."
         return render_template('error.html', error_message=error_message)
 
+def stream_research_events(brand_name, user_company_info, outreach_goal, desired_cta, deadline=None):
+    """
+    Yield research events for results_stream.html, turning a failure part-way
+    through into an 'error' event since the response has already started.
+    """
+    try:
+        yield from iter_research_brand(brand_name, user_company_info, outreach_goal, desired_cta, deadline=deadline)
+        app.logger.info("Research completed successfully")
+    except Exception as e:
+        app.logger.error(f"Error during research: {str(e)}")
+        yield 'error', brand_name, f"An error occurred during research: {str(e)}. Please try again."
+
+@app.route('/research/jobs/<job_id>')
+@limiter.exempt
+def research_job(job_id):
+    status = get_job_backend().status(job_id)
+    if status is None:
+        abort(404)
+    if status['state'] == DONE:
+        return render_template('results.html', results=status['result']['results'], brand_name=status['result']['brand_name'])
+    if status['state'] == FAILED:
+        error_message = f"An error occurred during research: {status['error']}. Please try again."
+        return render_template('error.html', error_message=error_message)
+    return render_template('job_status.html', job_id=job_id, state=status['state'])
+
+@app.route('/research/jobs/<job_id>/status')
+@limiter.exempt
+def research_job_status(job_id):
+    status = get_job_backend().status(job_id)
+    if status is None:
+        return jsonify(message="Job not found"), 404
+    return jsonify(status)
+
+@app.route('/metrics')
+@limiter.exempt
+def show_metrics():
+    return jsonify(metrics.snapshot())
+
+@app.route('/status')
+@limiter.exempt
+def show_status():
+    providers = circuit.status()
+    degraded = any(provider['state'] != circuit.CLOSED for provider in providers.values())
+    return jsonify(status='degraded' if degraded else 'ok', providers=providers)
+
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -0,0 +1,20 @@
+import asyncio
+from src.brand_research import brand_research
+
+
+def test_similar_brand_uses_domain_from_discovery(monkeypatch):
+    looked_up = []
+
+    async def find_company_emails_async(domain):
+        looked_up.append(domain)
+        return []
+
+    async def generate_tailored_email_async(user_company_info, company_name, outreach_goal, desired_cta):
+        return 'Hello'
+
+    monkeypatch.setattr(brand_research, 'find_company_emails_async', find_company_emails_async)
+    monkeypatch.setattr(brand_research, 'generate_tailored_email_async', generate_tailored_email_async)
+    brand = {'company': 'Co0', 'domain': 'https://www.co0.com/', 'reason': 'Same market'}
+    result = asyncio.run(brand_research.research_similar_brand_async(brand, 'We make laces', 'Partnership', 'Call'))
+    assert looked_up == ['co0.com']
+    assert result['domain'] == 'co0.com'
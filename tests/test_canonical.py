@@ -0,0 +1,43 @@
+from src.brand_research.canonical import BrandIndex, brand_domain, display_brand_name, normalize_brand_name
+
+
+def test_legal_suffixes_after_ampersand():
+    assert normalize_brand_name('Levi Strauss & Co.') == 'levi strauss'
+    assert display_brand_name('Levi Strauss & Co.') == 'Levi Strauss'
+    assert normalize_brand_name('Johnson & Johnson') == 'johnson and johnson'
+
+
+def test_brand_domain():
+    assert brand_domain('https://www.Allbirds.com/') == 'allbirds.com'
+    assert brand_domain('allbirds.com') == 'allbirds.com'
+    assert brand_domain('https://en.wikipedia.org/wiki/Allbirds') is None
+    assert brand_domain('https://www.amazon.co.uk/') is None
+    assert brand_domain('https://www.linkedin.com/company/rothys') is None
+    assert brand_domain('https://rothys.com/pages/about') is None
+
+
+def test_search_results_on_shared_sites_do_not_merge_brands(tmp_path):
+    index = BrandIndex(str(tmp_path / 'brands.db'))
+    index.observe('Allbirds', 'https://en.wikipedia.org/wiki/Allbirds')
+    index.observe('Rothys', 'https://en.wikipedia.org/wiki/Rothy%27s')
+    assert index.resolve('Rothys') == 'rothys'
+    assert index.display_name('Rothys') == 'Rothys'
+    assert index.get_domain('Allbirds') is None
+
+
+def test_new_name_on_known_website_becomes_alias(tmp_path):
+    index = BrandIndex(str(tmp_path / 'brands.db'))
+    index.observe('Nike', 'nike.com')
+    assert index.observe('Nike Sportswear', 'https://www.nike.com/') == 'nike'
+    assert index.resolve('Nike Sportswear') == 'nike'
+
+
+def test_known_brands_keep_their_website(tmp_path):
+    index = BrandIndex(str(tmp_path / 'brands.db'))
+    index.observe('Allbirds', 'allbirds.com')
+    index.observe('Rothys', 'rothys.com')
+    index.observe('Allbirds', 'https://rothys.com/')
+    index.observe('Allbirds', 'https://shop.example.com/')
+    assert index.resolve('Allbirds') == 'allbirds'
+    assert index.get_domain('Allbirds') == 'allbirds.com'
+    assert index.get_domain('Rothys') == 'rothys.com'
@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+from src.brand_research import llm
+
+
+class FakeStream:
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.closed = False
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            await asyncio.sleep(0.01)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def close(self):
+        self.closed = True
+
+
+def test_identical_streams_share_one_completion(monkeypatch):
+    calls = []
+
+    async def create(stage, messages, model, params, timeout=None, **extra):
+        calls.append(extra)
+        return FakeStream(['[{"company": ', '"Adidas"}]'])
+
+    monkeypatch.setattr(llm, '_create', create)
+    monkeypatch.setattr(llm, 'LLM_CACHE_ENABLED', False)
+    messages = [{'role': 'user', 'content': 'brands like Nike'}]
+
+    async def read():
+        return [piece async for piece in llm.stream_chat_completion_async('discovery', messages)]
+
+    async def main():
+        leader = asyncio.ensure_future(read())
+        await asyncio.sleep(0.005)
+        return await asyncio.gather(leader, read(), llm.chat_completion_async('discovery', messages))
+
+    leader, follower, completion = asyncio.run(main())
+    assert len(calls) == 1
+    assert leader == ['[{"company": ', '"Adidas"}]']
+    assert follower == ['[{"company": "Adidas"}]']
+    assert completion == '[{"company": "Adidas"}]'
@@ -0,0 +1,42 @@
+import time
+import asyncio
+import pytest
+from src.brand_research.ratelimit import RateLimiter, RateLimitExceeded
+
+
+def test_remaining_requests_go_out_before_reset():
+    limiter = RateLimiter('test', rate=8, burst=15, distributed=False)
+
+    async def main():
+        await limiter.observe(200, {'x-ratelimit-remaining': '1', 'x-ratelimit-reset': '60'})
+        started = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - started < 0.1
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire()
+
+    asyncio.run(main())
+
+
+def test_calls_wait_for_reset_once_remaining_are_used():
+    limiter = RateLimiter('test', rate=100, burst=10, distributed=False)
+
+    async def main():
+        await limiter.observe(200, {'x-ratelimit-remaining': '2', 'x-ratelimit-reset': '0.2'})
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    assert 0.15 < asyncio.run(main()) < 0.5
+
+
+def test_zero_remaining_pauses_until_reset():
+    limiter = RateLimiter('test', rate=8, burst=15, distributed=False)
+
+    async def main():
+        await limiter.observe(200, {'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '60'})
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire()
+
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+import time
+from src.brand_research import jobs
+from src.brand_research.jobs import InProcessJobBackend, set_job_backend, DONE
+from src.web.app import app
+
+FORM = {'brand_name': 'Allbirds', 'user_company_info': 'We make laces', 'outreach_goal': 'Partnership', 'desired_cta': 'Call'}
+
+
+def fake_research_brand(brand_name, user_company_info, outreach_goal, desired_cta, deadline=None):
+    return {brand_name: {'industry': 'Footwear', 'similar_brands': []}}
+
+
+def test_queued_research_with_in_process_backend(monkeypatch):
+    monkeypatch.setattr(jobs, 'research_brand', fake_research_brand)
+    monkeypatch.setitem(app.config, 'RESEARCH_MODE', 'queue')
+    set_job_backend(InProcessJobBackend(max_workers=1))
+    try:
+        client = app.test_client()
+        response = client.post('/research', data=FORM, headers={'Accept': 'application/json'})
+        assert response.status_code == 202
+        status_url = response.get_json()['status_url']
+        job_id = response.get_json()['job_id']
+
+        for _ in range(100):
+            status = client.get(status_url).get_json()
+            if status['state'] == DONE:
+                break
+            time.sleep(0.02)
+        assert status['state'] == DONE
+
+        page = client.get(f'/research/jobs/{job_id}')
+        assert page.status_code == 200
+        assert b'Footwear' in page.data
+        assert client.get('/research/jobs/missing/status').status_code == 404
+    finally:
+        set_job_backend(None)
+
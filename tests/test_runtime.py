@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+from src.brand_research.runtime import iter_sync
+
+
+def test_iter_sync_yields_items():
+    async def agen():
+        for i in range(3):
+            await asyncio.sleep(0)
+            yield i
+
+    assert list(iter_sync(agen())) == [0, 1, 2]
+
+
+def test_iter_sync_raises_generator_error():
+    async def agen():
+        yield 1
+        raise ValueError('boom')
+
+    items = iter_sync(agen())
+    assert next(items) == 1
+    with pytest.raises(ValueError):
+        next(items)
+
+
+def test_iter_sync_does_not_hang_on_cancelled_error():
+    async def agen():
+        yield 1
+        raise asyncio.CancelledError()
+
+    items = iter_sync(agen())
+    assert next(items) == 1
+    with pytest.raises(asyncio.CancelledError):
+        next(items)
@@ -0,0 +1,59 @@
+import pytest
+from src.brand_research import canonical
+from src.brand_research.canonical import BrandIndex
+from src.brand_research.similar_index import SimilarBrandIndex
+
+NIKE_ANSWER = [
+    {'company': 'Adidas', 'reason': 'Sportswear giant'},
+    {'company': 'Puma', 'reason': 'Athletic footwear'},
+    {'company': 'Reebok', 'reason': 'Fitness shoes'},
+]
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    path = str(tmp_path / 'brands.db')
+    monkeypatch.setattr(canonical, '_index', BrandIndex(path))
+    return SimilarBrandIndex(path)
+
+
+def research(index, brand_name, answer):
+    # As brand_research does with an LLM answer
+    for brand in answer:
+        canonical._index.observe(brand['company'])
+    index.add_research(brand_name, answer)
+
+
+def test_one_answer_is_not_enough(index):
+    research(index, 'Nike', NIKE_ANSWER)
+    assert index.similar('Nike', 3) == []
+
+
+def test_replayed_answer_is_not_confirmation(index):
+    # e.g. the same completion served from the LLM cache or a single-flight
+    for _ in range(3):
+        research(index, 'Nike', NIKE_ANSWER)
+    assert index.similar('Nike', 3) == []
+
+
+def test_confirmed_links_are_returned_with_the_seeds_reasons(index):
+    research(index, 'Nike', NIKE_ANSWER)
+    research(index, 'Nike', [
+        {'company': 'Adidas', 'reason': 'Global sportswear brand'},
+        {'company': 'Puma', 'reason': 'Sports shoes and apparel'},
+        {'company': 'Reebok', 'reason': 'Training footwear'},
+    ])
+    results = index.similar('Nike', 3)
+    assert {result['company'] for result in results} == {'Adidas', 'Puma', 'Reebok'}
+    assert all(result['reason'] in ('Global sportswear brand', 'Sports shoes and apparel', 'Training footwear')
+               for result in results)
+
+
+def test_reasons_are_not_borrowed_from_other_seeds(index):
+    canonical._index.describe('Puma', 'Like Nike, Reebok and Adidas')
+    research(index, 'Adidas', [{'company': 'Puma', 'reason': 'Like Nike, Reebok and Adidas'}])
+    research(index, 'Nike', [{'company': 'Adidas', 'reason': 'Sportswear giant'}])
+    research(index, 'Nike', [{'company': 'Adidas', 'reason': 'Global sportswear brand'}])
+    results = index.similar('Nike', 5)
+    assert [result['company'] for result in results] == ['Adidas']
+    assert results[0]['reason'] == 'Global sportswear brand'
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from src.brand_research.singleflight import SingleFlight
+from src.brand_research.deadline import DeadlineExceeded, deadline_scope, wait_for
+
+
+def test_followers_share_leader_result():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ['a@example.com']
+
+    async def main():
+        flight = SingleFlight('test-share')
+        return await asyncio.gather(*(flight.do('key', fetch) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert results == [['a@example.com']] * 3
+    assert len(calls) == 1
+
+
+def test_leader_cancelled_follower_still_gets_result():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return ['a@example.com']
+
+    async def main():
+        flight = SingleFlight('test-cancel')
+        leader = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ['a@example.com']
+    assert len(calls) == 1
+
+
+def test_follower_cancelled_does_not_cancel_leader():
+    async def fetch():
+        await asyncio.sleep(0.1)
+        return 'done'
+
+    async def main():
+        flight = SingleFlight('test-follower-cancel')
+        leader = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == 'done'
+
+
+def test_leader_deadline_does_not_fail_follower():
+    # The leader's short deadline cancels its wait (as research_brand's
+    # wait_for(find_company_emails_async(...)) does); a follower with a longer
+    # deadline retries the call instead of failing with the leader's error
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await wait_for(asyncio.sleep(0.2), 'test')
+        return 'done'
+
+    async def request(flight, seconds):
+        with deadline_scope(seconds):
+            return await wait_for(flight.do('key', fetch), 'test')
+
+    async def main():
+        flight = SingleFlight('test-deadline')
+        leader = asyncio.ensure_future(request(flight, 0.05))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(request(flight, 5))
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader_result, follower_result = asyncio.run(main())
+    assert isinstance(leader_result, DeadlineExceeded)
+    assert follower_result == 'done'
+    assert len(calls) == 2
+
+
+def test_errors_are_shared():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        raise ValueError('boom')
+
+    async def main():
+        flight = SingleFlight('test-error')
+        return await asyncio.gather(*(flight.do('key', fetch) for _ in range(2)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_follower_is_bounded_by_its_own_deadline():
+    async def fetch():
+        await asyncio.sleep(0.5)
+        return 'done'
+
+    async def follow(flight):
+        with deadline_scope(0.05):
+            return await flight.do('key', fetch)
+
+    async def main():
+        flight = SingleFlight('test-follower-deadline')
+        leader = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0.01)
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(DeadlineExceeded):
+            await follow(flight)
+        waited = asyncio.get_running_loop().time() - started
+        return waited, await leader
+
+    waited, result = asyncio.run(main())
+    assert waited < 0.3
+    assert result == 'done'